@@ -0,0 +1,145 @@
+"""Compare decoding bet rows the old way (sqlite3.Row, plain dataclass, eager
+datetime parsing) with the current tuple rows into slotted models.
+
+    python -m benchmarks.decode [--bets 100000]
+"""
+
+import argparse
+import sqlite3
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import starmap
+from typing import Optional
+
+from models import Bet
+
+COLUMNS = (
+    "id, player_id, platform, market_id, market_title, position, price_cents, "
+    "stake_cents, placed_at, placed_year, placed_month, resolved_at, outcome, "
+    "payout_cents"
+)
+
+
+@dataclass
+class LegacyBet:
+    id: int
+    player_id: int
+    platform: str
+    market_id: str
+    market_title: Optional[str]
+    position: str
+    price_cents: int
+    stake_cents: int
+    placed_at: datetime
+    placed_year: int
+    placed_month: int
+    resolved_at: Optional[datetime]
+    outcome: Optional[str]
+    payout_cents: Optional[int]
+
+
+def legacy_decode(conn: sqlite3.Connection) -> list[LegacyBet]:
+    conn.row_factory = sqlite3.Row
+    rows = conn.execute(f"SELECT {COLUMNS} FROM bets").fetchall()
+    return [
+        LegacyBet(
+            id=row["id"],
+            player_id=row["player_id"],
+            platform=row["platform"],
+            market_id=row["market_id"],
+            market_title=row["market_title"],
+            position=row["position"],
+            price_cents=row["price_cents"],
+            stake_cents=row["stake_cents"],
+            placed_at=datetime.fromisoformat(row["placed_at"]),
+            placed_year=row["placed_year"],
+            placed_month=row["placed_month"],
+            resolved_at=(
+                datetime.fromisoformat(row["resolved_at"])
+                if row["resolved_at"]
+                else None
+            ),
+            outcome=row["outcome"],
+            payout_cents=row["payout_cents"],
+        )
+        for row in rows
+    ]
+
+
+def current_decode(conn: sqlite3.Connection) -> list[Bet]:
+    conn.row_factory = None
+    return list(starmap(Bet, conn.execute(f"SELECT {COLUMNS} FROM bets")))
+
+
+def seed(conn: sqlite3.Connection, bets: int):
+    conn.execute(
+        """
+        CREATE TABLE bets (
+            id INTEGER PRIMARY KEY, player_id INTEGER, platform TEXT,
+            market_id TEXT, market_title TEXT, position TEXT, price_cents INTEGER,
+            stake_cents INTEGER, placed_at TIMESTAMP, placed_year INTEGER,
+            placed_month INTEGER, resolved_at TIMESTAMP, outcome TEXT,
+            payout_cents INTEGER
+        )
+        """
+    )
+    conn.executemany(
+        f"INSERT INTO bets ({COLUMNS}) VALUES (?, ?, 'polymarket', ?, ?, 'yes', 40, "
+        "100, '2025-03-04 12:00:00', 2025, 3, ?, ?, ?)",
+        (
+            (
+                i,
+                i % 500,
+                str(i % 5000),
+                f"Market {i % 5000}",
+                "2025-04-01 08:30:00" if i % 3 else None,
+                "win" if i % 3 else None,
+                250 if i % 3 else None,
+            )
+            for i in range(1, bets + 1)
+        ),
+    )
+    conn.commit()
+
+
+def measure(decode, conn: sqlite3.Connection) -> tuple[float, int]:
+    """Returns (seconds, peak bytes allocated) for one decode of every row."""
+    start = time.perf_counter()
+    decode(conn)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    result = decode(conn)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bets", type=int, default=100_000)
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(":memory:")
+    seed(conn, args.bets)
+
+    results = {
+        "legacy": measure(legacy_decode, conn),
+        "current": measure(current_decode, conn),
+    }
+    for name, (seconds, peak) in results.items():
+        print(f"{name:>8}: {seconds * 1000:8.1f} ms  {peak / 1_048_576:8.1f} MiB peak")
+
+    legacy_seconds, legacy_peak = results["legacy"]
+    seconds, peak = results["current"]
+    print(
+        f"speedup {legacy_seconds / seconds:.1f}x, "
+        f"memory {peak / legacy_peak:.0%} of legacy ({args.bets} bets)"
+    )
+
+
+if __name__ == "__main__":
+    main()
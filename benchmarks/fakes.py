@@ -0,0 +1,34 @@
+"""Stand-ins for discord.py objects, shared by the load harness and the tests."""
+
+from types import SimpleNamespace
+
+
+class FakeInteraction:
+    """Just enough of discord.Interaction for the command handlers.
+
+    Everything the handler sends, by any route, is recorded in `sent`.
+    """
+
+    def __init__(self, user_id: int = 1):
+        self.user = SimpleNamespace(id=user_id)
+        self.sent: list[dict] = []
+        self.response = SimpleNamespace(
+            defer=self._defer, send_message=self._send, edit_message=self._send
+        )
+        self.followup = SimpleNamespace(send=self._send)
+
+    async def _defer(self, **kwargs):
+        pass
+
+    async def _send(self, content=None, **kwargs):
+        self.sent.append({"content": content, **kwargs})
+
+    @property
+    def outcome(self) -> str:
+        """A short label for how the command ended."""
+        if not self.sent:
+            return "no reply"
+        content = self.sent[-1]["content"]
+        if content is None:
+            return "ok"
+        return content.split("\n", 1)[0][:40]
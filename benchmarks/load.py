@@ -0,0 +1,286 @@
+"""Concurrent end-to-end load test of the /bet, /bets and /leaderboard handlers.
+
+    python -m benchmarks.load [--users 500] [--requests 2000] [--concurrency 50]
+                              [--latency-ms 80] [--error-rate 0.02] [--output FILE]
+
+The real command handlers run against a temporary database and a local
+stand-in for the Gamma API with tunable latency and error rate, driven by
+fake interactions. Reports p50/p95/p99 latency per command and overall
+throughput.
+
+By default every user may place 16 bets, as in the January rush; pass
+--allowance to change that.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from itertools import accumulate
+from pathlib import Path
+
+from aiohttp import web
+
+from benchmarks.fakes import FakeInteraction
+from commands import bet, bets, leaderboard
+from services import database, polymarket, resolver
+from services.market_cache import MarketCache
+from services.resilience import TokenBucket
+from services.scheduler import ResolutionScheduler
+
+DEFAULT_MIX = {"bet": 0.6, "bets": 0.25, "leaderboard": 0.15}
+
+
+class GammaStandIn:
+    """A local Gamma API serving `markets` synthetic yes/no markets.
+
+    Every request waits `latency` seconds (+/- 50% jitter) and fails with a
+    503 with probability `error_rate`.
+    """
+
+    def __init__(self, markets: int, latency: float, error_rate: float, seed: int = 0):
+        self.markets = markets
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.requests: Counter[str] = Counter()
+        self._runner: web.AppRunner | None = None
+        self.base_url = ""
+
+    def market(self, market_id: str) -> dict:
+        price = 0.05 + (int(market_id) * 37 % 90) / 100
+        return {
+            "id": market_id,
+            "slug": f"market-{market_id}",
+            "question": f"Will synthetic market {market_id} resolve yes?",
+            "outcomes": '["Yes", "No"]',
+            "outcomePrices": json.dumps([f"{price:.2f}", f"{1 - price:.2f}"]),
+            "closed": False,
+            "endDate": "2099-12-31T00:00:00Z",
+        }
+
+    async def start(self):
+        app = web.Application(middlewares=[self._simulate])
+        app.router.add_get("/markets", self._markets)
+        app.router.add_get("/markets/{id}", self._market)
+        app.router.add_get("/events/slug/{slug}", self._event)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.base_url = f"http://127.0.0.1:{port}"
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    @web.middleware
+    async def _simulate(self, request: web.Request, handler):
+        self.requests[request.match_info.route.resource.canonical] += 1
+        await asyncio.sleep(self.latency * self.rng.uniform(0.5, 1.5))
+        if self.rng.random() < self.error_rate:
+            return web.json_response({}, status=503)
+        return await handler(request)
+
+    async def _markets(self, request: web.Request) -> web.Response:
+        slug = request.query.get("slug")
+        if slug:
+            return web.json_response([self.market(slug.removeprefix("market-"))])
+        return web.json_response(
+            [self.market(market_id) for market_id in request.query.getall("id", [])]
+        )
+
+    async def _market(self, request: web.Request) -> web.Response:
+        return web.json_response(self.market(request.match_info["id"]))
+
+    async def _event(self, request: web.Request) -> web.Response:
+        market_id = request.match_info["slug"].removeprefix("event-")
+        return web.json_response({"markets": [self.market(market_id)]})
+
+
+@dataclass
+class Results:
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    outcomes: dict[str, Counter] = field(default_factory=lambda: defaultdict(Counter))
+    elapsed: float = 0.0
+
+    def report(self) -> dict:
+        total = sum(len(samples) for samples in self.latencies.values())
+        commands = {}
+        for name, samples in sorted(self.latencies.items()):
+            cuts = (
+                statistics.quantiles(samples, n=100)
+                if len(samples) > 1
+                else samples * 99
+            )
+            commands[name] = {
+                "requests": len(samples),
+                "p50_ms": round(cuts[49] * 1000, 2),
+                "p95_ms": round(cuts[94] * 1000, 2),
+                "p99_ms": round(cuts[98] * 1000, 2),
+                "max_ms": round(max(samples) * 1000, 2),
+                "outcomes": dict(self.outcomes[name].most_common()),
+            }
+        return {
+            "requests": total,
+            "elapsed_s": round(self.elapsed, 3),
+            "throughput_rps": round(total / self.elapsed, 1) if self.elapsed else 0,
+            "commands": commands,
+        }
+
+
+async def run_load(
+    users: int = 500,
+    requests: int = 2000,
+    concurrency: int = 50,
+    markets: int = 200,
+    latency: float = 0.08,
+    error_rate: float = 0.02,
+    allowance: int = 16,
+    mix: dict[str, float] = DEFAULT_MIX,
+    seed: int = 0,
+) -> dict:
+    """Drive the handlers against the current database and return a report.
+
+    Registers `users` players for the current year, then issues `requests`
+    commands from `concurrency` concurrent workers.
+    """
+    rng = random.Random(seed)
+    gamma = GammaStandIn(markets, latency, error_rate, seed)
+    await gamma.start()
+
+    client = polymarket.PolymarketClient(
+        base_url=gamma.base_url,
+        # Measure the bot, not the client-side rate limit
+        limiter=TokenBucket(rate=1e6, capacity=1e6),
+    )
+    saved = (
+        polymarket._client,
+        resolver.market_cache,
+        resolver.scheduler,
+        database.monthly_allowance,
+    )
+    polymarket.set_client(client)
+    resolver.market_cache = MarketCache()
+    resolver.scheduler = ResolutionScheduler()
+    database.monthly_allowance = lambda month: allowance
+    leaderboard._rendered.clear()
+
+    year = time.localtime().tm_year
+    for user_id in range(1, users + 1):
+        await database.register_player(str(user_id), year)
+
+    # Popular markets draw most bets, as with real headline markets
+    market_weights = list(accumulate(1 / (k + 1) for k in range(markets)))
+    commands = list(mix)
+    command_weights = list(mix.values())
+
+    def next_call():
+        name = rng.choices(commands, command_weights)[0]
+        interaction = FakeInteraction(rng.randint(1, users))
+        if name == "bet":
+            market = rng.choices(range(markets), cum_weights=market_weights)[0]
+            url = (
+                f"https://polymarket.com/event/event-{market}"
+                if rng.random() < 0.5
+                else f"https://polymarket.com/event/event-{market}/market-{market}"
+            )
+            call = bet.bet(interaction, url, rng.choice(("yes", "no")))
+        elif name == "bets":
+            call = bets.bets(interaction)
+        else:
+            call = leaderboard.leaderboard(interaction)
+        return name, interaction, call
+
+    results = Results()
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            name, interaction, call = next_call()
+            start = time.perf_counter()
+            try:
+                await call
+                outcome = interaction.outcome
+            except Exception as e:
+                outcome = f"error: {type(e).__name__}"
+            results.latencies[name].append(time.perf_counter() - start)
+            results.outcomes[name][outcome] += 1
+
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        results.elapsed = time.perf_counter() - start
+    finally:
+        await client.close()
+        await gamma.close()
+        (
+            polymarket._client,
+            resolver.market_cache,
+            resolver.scheduler,
+            database.monthly_allowance,
+        ) = saved
+
+    report = results.report()
+    report["gamma_requests"] = dict(gamma.requests)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--markets", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=80)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--allowance", type=int, default=16)
+    parser.add_argument("--output", type=Path, help="write JSON here (default stdout)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database.DATABASE_PATH = str(Path(directory) / "load.db")
+        database.init_db()
+        try:
+            report = asyncio.run(
+                run_load(
+                    users=args.users,
+                    requests=args.requests,
+                    concurrency=args.concurrency,
+                    markets=args.markets,
+                    latency=args.latency_ms / 1000,
+                    error_rate=args.error_rate,
+                    allowance=args.allowance,
+                )
+            )
+        finally:
+            database.close_db()
+
+    for name, stats in report["commands"].items():
+        print(
+            f"{name:<12}{stats['requests']:>6} req  p50 {stats['p50_ms']:>8.1f} ms  "
+            f"p95 {stats['p95_ms']:>8.1f} ms  p99 {stats['p99_ms']:>8.1f} ms",
+            file=sys.stderr,
+        )
+    print(
+        f"{report['requests']} requests in {report['elapsed_s']}s: "
+        f"{report['throughput_rps']} req/s",
+        file=sys.stderr,
+    )
+
+    encoded = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(encoded + "\n")
+    else:
+        print(encoded)
+
+
+if __name__ == "__main__":
+    main()
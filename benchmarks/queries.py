@@ -0,0 +1,217 @@
+"""Time the services/database.py queries against synthetic seasons.
+
+    python -m benchmarks.queries [--sizes 1000 100000 1000000] [--output FILE]
+                                 [--compare BASELINE.json]
+
+For each size a fresh database is generated in a temp directory, then every
+query is run repeatedly through the public async API. Results (milliseconds
+per call) are written as JSON so runs from different commits can be
+compared with --compare.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable
+
+from benchmarks import seasons
+from services import database
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+
+# Stop repeating a query after this many calls or this much wall time
+MAX_CALLS = 50
+TIME_BUDGET_SECONDS = 2.0
+
+
+def queries(
+    season: seasons.Season, newcomers: list[str]
+) -> dict[str, Callable[[], Awaitable]]:
+    """The calls to time, with arguments chosen from the generated data.
+
+    Writes come last since they change the data. Each `place_bet` call uses
+    the next of `newcomers` (registered players with no bets yet) so every
+    call inserts, and each `resolve_markets` call settles the next most
+    popular market.
+    """
+    player_id = season.busiest_player_id
+    discord_id = season.busiest_discord_id
+    year = season.years[-1]
+    popular = [("polymarket", str(market)) for market in range(20)]
+    bettors = iter(newcomers)
+    settling = itertools.count()
+
+    return {
+        "get_player": lambda: database.get_player(discord_id, year),
+        "get_bets_for_player": lambda: database.get_bets_for_player(player_id),
+        "get_bets_page": lambda: database.get_bets_page(player_id, 10),
+        "get_bet_summary": lambda: database.get_bet_summary(player_id),
+        "has_bet_on_market": lambda: database.has_bet_on_market(player_id, "0"),
+        "get_remaining_bets": lambda: database.get_remaining_bets(player_id),
+        "get_remaining_bets_for": lambda: database.get_remaining_bets_for(
+            discord_id, year
+        ),
+        "get_leaderboard": lambda: database.get_leaderboard(year),
+        "get_all_unresolved_bets": database.get_all_unresolved_bets,
+        "get_pending_markets": database.get_pending_markets,
+        "get_market_resolutions": lambda: database.get_market_resolutions(popular),
+        "get_market_by_slug": lambda: database.get_market_by_slug(
+            "polymarket", "missing"
+        ),
+        "get_event": lambda: database.get_event("polymarket", "missing"),
+        "get_bets_used_in_month": lambda: database.get_bets_used_in_month(
+            player_id, year, 1
+        ),
+        "get_bets_used_in_january": lambda: database.get_bets_used_in_january(
+            player_id
+        ),
+        "count_unresolved_bets": database.count_unresolved_bets,
+        "stream_bets_for_player": lambda: drain(
+            database.stream_bets_for_player(player_id)
+        ),
+        "stream_unresolved_bets": lambda: drain(database.stream_unresolved_bets()),
+        "place_bet": lambda: database.place_bet(
+            next(bettors), "polymarket", "0", "Synthetic market 0", "yes", 50
+        ),
+        "resolve_markets": lambda: database.resolve_markets(
+            [("polymarket", str(next(settling)), "yes")]
+        ),
+    }
+
+
+async def drain(stream: AsyncIterator[list]):
+    async for _ in stream:
+        pass
+
+
+async def time_query(call: Callable[[], Awaitable]) -> dict:
+    await call()  # warm the page cache and statement cache
+    samples = []
+    deadline = time.perf_counter() + TIME_BUDGET_SECONDS
+    while len(samples) < MAX_CALLS and (not samples or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        await call()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    samples.sort()
+    return {
+        "calls": len(samples),
+        "min_ms": round(samples[0], 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[int(0.95 * (len(samples) - 1))], 3),
+    }
+
+
+def run_size(bets: int, directory: Path) -> dict:
+    database.close_db()
+    database.DATABASE_PATH = str(directory / f"season-{bets}.db")
+    database.init_db()
+
+    start = time.perf_counter()
+    with database.get_pool().writer() as conn:
+        season = seasons.generate(conn, bets)
+        newcomers = [f"newcomer-{n}" for n in range(MAX_CALLS + 1)]
+        conn.executemany(
+            "INSERT INTO players (discord_id, year) VALUES (?, ?)",
+            [(discord_id, season.years[-1]) for discord_id in newcomers],
+        )
+        conn.commit()
+    generated_in = time.perf_counter() - start
+    print(
+        f"{bets:>9} bets: {season.players} player-seasons, {season.markets} "
+        f"markets (generated in {generated_in:.1f}s)",
+        file=sys.stderr,
+    )
+
+    async def run():
+        results = {}
+        for name, call in queries(season, newcomers).items():
+            results[name] = await time_query(call)
+            print(
+                f"{'':>11}{name:<26}{results[name]['median_ms']:>10.3f} ms",
+                file=sys.stderr,
+            )
+        return results
+
+    try:
+        return {
+            "players": season.players,
+            "markets": season.markets,
+            "queries": asyncio.run(run()),
+        }
+    finally:
+        database.close_db()
+
+
+def metadata() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "machine": platform.machine(),
+    }
+
+
+def compare(baseline: dict, current: dict):
+    """Print median-time ratios of `current` against `baseline`."""
+    print(f"\nvs {baseline['meta'].get('commit')}: median ratio (>1 is slower)")
+    for size, result in current["sizes"].items():
+        old = baseline["sizes"].get(size)
+        if old is None:
+            continue
+        for name, stats in result["queries"].items():
+            before = old["queries"].get(name)
+            if before is None:
+                continue
+            ratio = stats["median_ms"] / max(before["median_ms"], 1e-6)
+            flag = "  <-- regression" if ratio > 1.25 else ""
+            print(f"{size:>9} {name:<26}{ratio:>7.2f}x{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--output", type=Path, help="write JSON here (default stdout)")
+    parser.add_argument("--compare", type=Path, help="baseline JSON to compare with")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        report = {
+            "meta": metadata(),
+            "sizes": {
+                str(size): run_size(size, Path(directory)) for size in args.sizes
+            },
+        }
+
+    encoded = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(encoded + "\n")
+    else:
+        print(encoded)
+
+    if args.compare:
+        compare(json.loads(args.compare.read_text()), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Synthetic season data for benchmarks.
+
+Fills a GambaBot database with several years of plausible play: most bets
+land in January (16 allowed) and one a month after that, market popularity
+is heavily skewed (a few markets draw a large share of bets), past seasons
+are fully settled and the current one is a mix of resolved and pending.
+"""
+
+import random
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Optional
+
+from services import database
+
+MONTH_WEIGHTS = [16] + [1] * 11
+
+
+@dataclass(slots=True, frozen=True)
+class Season:
+    """What generate() produced, for picking realistic query arguments."""
+
+    bets: int
+    players: int
+    markets: int
+    years: list[int]
+    busiest_player_id: int
+    busiest_discord_id: str
+
+
+def generate(
+    conn: sqlite3.Connection,
+    bets: int,
+    years: int = 3,
+    now: Optional[datetime] = None,
+    seed: int = 0,
+) -> Season:
+    """Insert `bets` bets across `years` seasons ending with `now`'s year.
+
+    `conn` must be a migrated database's writer connection. Standings are
+    rebuilt in one pass at the end rather than maintained row by row.
+    """
+    rng = random.Random(seed)
+    now = now or datetime.now()
+    season_years = list(range(now.year - years + 1, now.year + 1))
+
+    # Roughly 20 bets per player-season, as a full January plus a few months
+    users = max(20, bets // (20 * years))
+    market_count = max(50, bets // 10)
+    # Zipf-like popularity: market k is picked with weight 1 / (k + 1)
+    market_weights = list(accumulate(1 / (k + 1) for k in range(market_count)))
+
+    players = [
+        (str(10**17 + user), year)
+        for year in season_years
+        for user in range(users)
+        if year == now.year or rng.random() < 0.7
+    ]
+    conn.executemany("INSERT INTO players (discord_id, year) VALUES (?, ?)", players)
+    player_rows = conn.execute("SELECT id, year FROM players ORDER BY id").fetchall()
+
+    # Bulk-load without per-row trigger work, then recreate the trigger
+    conn.execute("DROP TRIGGER IF EXISTS standings_on_bet")
+
+    taken: set[tuple[int, int]] = set()
+    rows = []
+    inserted = 0
+    while inserted < bets:
+        player_id, year = rng.choice(player_rows)
+        last_month = now.month if year == now.year else 12
+        month = rng.choices(range(1, last_month + 1), MONTH_WEIGHTS[:last_month])[0]
+        market = rng.choices(range(market_count), cum_weights=market_weights)[0]
+        if (player_id, market) in taken:
+            continue
+        taken.add((player_id, market))
+
+        placed_at = min(
+            now, datetime(year, month, 1) + timedelta(seconds=rng.randrange(28 * 86400))
+        )
+        price_cents = rng.randint(2, 98)
+        stake_cents = database.get_bet_stake(month)
+        # Older bets are more likely to have settled
+        age_days = (now - placed_at).days
+        settled = year < now.year or rng.random() < min(0.95, age_days / 60)
+
+        outcome = payout_cents = resolved_at = None
+        if settled:
+            won = rng.random() * 100 >= price_cents
+            outcome = "win" if won else "loss"
+            payout_cents = stake_cents * 100 // price_cents if won else 0
+            resolved_at = (placed_at + timedelta(days=rng.randint(1, 60))).isoformat(
+                " ", "seconds"
+            )
+
+        rows.append(
+            (
+                player_id,
+                str(market),
+                f"Synthetic market {market}",
+                rng.choice(("yes", "no")),
+                price_cents,
+                stake_cents,
+                placed_at.isoformat(" ", "seconds"),
+                year,
+                month,
+                resolved_at,
+                outcome,
+                payout_cents,
+            )
+        )
+        inserted += 1
+        if len(rows) == 50_000 or inserted == bets:
+            _insert_bets(conn, rows)
+            rows.clear()
+    conn.commit()
+
+    conn.executescript(database.migrations.SCHEMA_PATH.read_text())
+    database._rebuild_standings(conn)
+
+    busiest = conn.execute(
+        """
+        SELECT p.id, p.discord_id FROM bets b
+        JOIN players p ON p.id = b.player_id
+        WHERE p.year = ?
+        GROUP BY p.id
+        ORDER BY COUNT(*) DESC
+        LIMIT 1
+        """,
+        (now.year,),
+    ).fetchone()
+    return Season(
+        bets=inserted,
+        players=len(player_rows),
+        markets=market_count,
+        years=season_years,
+        busiest_player_id=busiest[0],
+        busiest_discord_id=busiest[1],
+    )
+
+
+def _insert_bets(conn: sqlite3.Connection, rows: list[tuple]):
+    conn.executemany(
+        """
+        INSERT INTO bets (player_id, platform, market_id, market_title, position,
+                          price_cents, stake_cents, placed_at, placed_year,
+                          placed_month, resolved_at, outcome, payout_cents)
+        VALUES (?, 'polymarket', ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
@@ -1,18 +1,82 @@
+import logging
+import time
+
 import discord
 from discord import app_commands
+from discord.ext import tasks
 
-from config import DISCORD_TOKEN
-from services import database
+from config import (
+    DISCORD_TOKEN,
+    METRICS_HOST,
+    METRICS_PORT,
+    PROFILE_LOG_BACKUPS,
+    PROFILE_LOG_MAX_BYTES,
+    PROFILE_LOG_PATH,
+    PROFILE_SAMPLE_RATE,
+    PROFILE_SLOW_SECONDS,
+    RESOLVE_INTERVAL_SECONDS,
+    RESOLVE_STREAM_FALLBACK_SECONDS,
+    RESOLVE_STREAM_REFRESH_SECONDS,
+    RESOLVE_STREAM_URL,
+)
+from services import database, metrics, polymarket, profiler, resolver
+from services.market_stream import MarketStream
 from commands import register, bet, bets, leaderboard, rules
 
+log = logging.getLogger(__name__)
+
+
+class CommandTree(app_commands.CommandTree):
+    """Times every slash command for /metrics."""
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        interaction.extras["started_at"] = time.perf_counter()
+        return True
+
+    async def on_error(
+        self, interaction: discord.Interaction, error: app_commands.AppCommandError
+    ):
+        _observe_command(interaction, "error")
+        await super().on_error(interaction, error)
+
+
+def _observe_command(interaction: discord.Interaction, status: str):
+    started_at = interaction.extras.get("started_at")
+    name = interaction.command.qualified_name if interaction.command else "unknown"
+    if started_at is not None:
+        metrics.COMMAND_SECONDS.observe(time.perf_counter() - started_at, name)
+    metrics.COMMANDS.inc(name, status)
+
 
 class GambaBot(discord.Client):
     def __init__(self):
         intents = discord.Intents.default()
         super().__init__(intents=intents)
-        self.tree = app_commands.CommandTree(self)
+        self.tree = CommandTree(self)
+        self.polymarket = polymarket.PolymarketClient()
+        self.metrics: metrics.MetricsServer | None = None
+        self.market_stream: MarketStream | None = None
 
     async def setup_hook(self):
+        await self.polymarket.start()
+        polymarket.set_client(self.polymarket)
+
+        if METRICS_PORT:
+            metrics.enable()
+            self.metrics = metrics.MetricsServer(METRICS_HOST, METRICS_PORT)
+            await self.metrics.start()
+            print(f"Metrics on http://{METRICS_HOST}:{self.metrics.port}/metrics")
+
+        if PROFILE_SLOW_SECONDS:
+            profiler.enable(
+                PROFILE_SLOW_SECONDS,
+                PROFILE_LOG_PATH,
+                PROFILE_LOG_MAX_BYTES,
+                PROFILE_LOG_BACKUPS,
+                PROFILE_SAMPLE_RATE,
+            )
+            print(f"Logging interactions slower than {PROFILE_SLOW_SECONDS}s")
+
         register.setup(self.tree)
         bet.setup(self.tree)
         bets.setup(self.tree)
@@ -22,9 +86,49 @@ class GambaBot(discord.Client):
         await self.tree.sync()
         print("Commands synced!")
 
+        if RESOLVE_STREAM_URL:
+            self.market_stream = MarketStream(
+                RESOLVE_STREAM_URL, RESOLVE_STREAM_REFRESH_SECONDS
+            )
+            self.market_stream.start()
+
+        self.resolve_pending.start()
+
+    @tasks.loop(seconds=RESOLVE_INTERVAL_SECONDS)
+    async def resolve_pending(self):
+        try:
+            if resolver.stream_connected:
+                # Settlements arrive over the stream; poll only as a fallback
+                resolved = await resolver.refresh_if_stale(
+                    RESOLVE_STREAM_FALLBACK_SECONDS
+                )
+            else:
+                resolved = await resolver.sweep()
+        except Exception:
+            log.exception("Resolution sweep failed")
+            return
+        if resolved:
+            log.info("Resolved %d bet(s)", resolved)
+
+    async def on_app_command_completion(
+        self, interaction: discord.Interaction, command: app_commands.Command
+    ):
+        _observe_command(interaction, "ok")
+
+    async def close(self):
+        self.resolve_pending.cancel()
+        if self.market_stream is not None:
+            await self.market_stream.close()
+        if self.metrics is not None:
+            await self.metrics.close()
+        await self.polymarket.close()
+        polymarket.set_client(None)
+        await super().close()
+
 
 def main():
-    database.init_db()
+    for name in database.init_db():
+        print(f"Applied migration {name}")
     print("Database initialized.")
 
     client = GambaBot()
@@ -34,7 +138,10 @@ def main():
         print(f"Logged in as {client.user} (ID: {client.user.id})")
         print(f"Serving {len(client.guilds)} guild(s)")
 
-    client.run(DISCORD_TOKEN)
+    try:
+        client.run(DISCORD_TOKEN)
+    finally:
+        database.close_db()
 
 
 if __name__ == "__main__":
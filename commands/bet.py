@@ -1,11 +1,13 @@
+import asyncio
 from datetime import datetime
 from typing import Literal
 
 import discord
 from discord import app_commands
 
-from services import database, resolver
+from services import database, profiler, resolver
 from services.database import get_bet_stake
+from services.polymarket import PolymarketUnavailable
 
 
 async def bet(
@@ -14,26 +16,27 @@ async def bet(
     await interaction.response.defer(thinking=True)
 
     now = datetime.now()
-    year = now.year
     discord_id = str(interaction.user.id)
 
-    player = database.get_player(discord_id, year)
-    if not player:
-        await interaction.followup.send(
-            "❌ You're not registered for this year. Use `/register` first (January only).",
-            ephemeral=True,
+    # Look the market up while we check the player; most bets pass the checks
+    market_task = asyncio.ensure_future(resolver.get_market_info(url))
+    remaining = await database.get_remaining_bets_for(discord_id, now.year)
+    if remaining is None or remaining <= 0:
+        _discard(market_task)
+        await _reject(
+            interaction, "not_registered" if remaining is None else "no_bets_remaining"
         )
         return
 
-    remaining = database.get_remaining_bets(player.id)
-    if remaining <= 0:
-        month_name = now.strftime("%B")
+    try:
+        market = await market_task
+    except PolymarketUnavailable:
         await interaction.followup.send(
-            f"❌ You have no bets remaining for {month_name}.", ephemeral=True
+            "❌ Polymarket isn't responding right now. Try again in a minute.",
+            ephemeral=True,
         )
         return
 
-    market = await resolver.get_market_info(url)
     if not market:
         await interaction.followup.send(
             "❌ Couldn't find that market. Check the URL and try again.\n"
@@ -42,12 +45,6 @@ async def bet(
         )
         return
 
-    if database.has_bet_on_market(player.id, market.market_id):
-        await interaction.followup.send(
-            "❌ You've already placed a bet on this market.", ephemeral=True
-        )
-        return
-
     if market.resolved:
         await interaction.followup.send(
             "❌ This market has already resolved. Pick an open market.", ephemeral=True
@@ -65,8 +62,8 @@ async def bet(
     stake_cents = get_bet_stake(now.month)
     payout_cents = (stake_cents * 100) // price_cents
 
-    database.create_bet(
-        player_id=player.id,
+    placement = await database.place_bet(
+        discord_id=discord_id,
         platform=market.platform,
         market_id=market.market_id,
         market_title=market.title[:200],
@@ -74,22 +71,44 @@ async def bet(
         price_cents=price_cents,
     )
 
+    if placement.status != "placed":
+        await _reject(interaction, placement.status)
+        return
+
     await interaction.followup.send(
         f"✅ **Bet placed!**\n"
         f"**{market.title[:100]}**\n"
         f"Stake: **${stake_cents / 100:.0f}** | Position: **{position.upper()}** @ ${price_cents / 100:.2f}\n"
         f"Potential payout: **${payout_cents / 100:.2f}**\n"
-        f"Bets remaining: **{remaining - 1}**",
+        f"Bets remaining: **{placement.remaining}**",
         ephemeral=True,
     )
 
 
+async def _reject(interaction: discord.Interaction, status: str):
+    if status == "not_registered":
+        message = "❌ You're not registered for this year. Use `/register` first (January only)."
+    elif status == "no_bets_remaining":
+        month_name = datetime.now().strftime("%B")
+        message = f"❌ You have no bets remaining for {month_name}."
+    else:
+        message = "❌ You've already placed a bet on this market."
+    await interaction.followup.send(message, ephemeral=True)
+
+
+def _discard(task: asyncio.Task):
+    """Cancel a lookup we no longer need without leaving its error unretrieved."""
+    task.cancel()
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+
 def setup(tree: app_commands.CommandTree):
     @tree.command(name="bet", description="Place a bet on a prediction market")
     @app_commands.describe(
         url="Link to a Polymarket market outcome (copy button in top right)",
         position="Bet YES or NO on this market",
     )
+    @profiler.profiled
     async def bet_command(
         interaction: discord.Interaction, url: str, position: Literal["yes", "no"]
     ):
@@ -3,7 +3,10 @@ from datetime import datetime
 import discord
 from discord import app_commands
 
-from services import database, resolver
+from models import Bet, BetPage
+from services import database, profiler
+
+PAGE_SIZE = 10
 
 
 async def bets(interaction: discord.Interaction):
@@ -12,103 +15,105 @@ async def bets(interaction: discord.Interaction):
     year = datetime.now().year
     discord_id = str(interaction.user.id)
 
-    player = database.get_player(discord_id, year)
+    player = await database.get_player(discord_id, year)
     if not player:
         await interaction.followup.send(
             "❌ You're not registered for this year.", ephemeral=True
         )
         return
 
-    await resolver.resolve_player_bets(player.id)
-
-    player_bets = database.get_bets_for_player(player.id)
-    remaining = database.get_remaining_bets(player.id)
+    summary = await database.get_bet_summary(player.id)
 
-    if not player_bets:
+    if not summary["bet_count"]:
         await interaction.followup.send(
             f"📋 **Your Bets ({year})**\n"
             f"No bets placed yet.\n"
-            f"Bets remaining this month: **{remaining}**",
+            f"Bets remaining this month: **{summary['remaining_bets']}**",
             ephemeral=True,
         )
         return
 
-    total_cents = sum(b.payout_cents or 0 for b in player_bets if b.outcome == "win")
-    biggest_cents = max(
-        (b.payout_cents or 0 for b in player_bets if b.outcome == "win"), default=0
-    )
-
-    pending = [b for b in player_bets if b.outcome is None]
-    wins = [b for b in player_bets if b.outcome == "win"]
-    losses = [b for b in player_bets if b.outcome == "loss"]
-
-    # Max return = current winnings + potential from pending bets
-    pending_potential_cents = sum(
-        b.stake_cents * 100 // b.price_cents for b in pending
-    )
-    max_return_cents = total_cents + pending_potential_cents
-
-    embed = discord.Embed(title=f"📋 Your Bets ({year})", color=discord.Color.blue())
-
-    embed.add_field(
-        name="Summary",
-        value=(
-            f"Total Winnings: **${total_cents / 100:.2f}**\n"
-            f"Biggest Win: **${biggest_cents / 100:.2f}**\n"
-            f"Max Return: **${max_return_cents / 100:.2f}**\n"
-            f"Bets Remaining: **{remaining}**"
-        ),
-        inline=False,
-    )
-
-    def add_chunked_fields(embed, name: str, lines: list[str]):
-        """Add fields, splitting into multiple if content exceeds 1024 chars."""
-        if not lines:
-            return
-        chunks = []
-        current_chunk = []
-        current_len = 0
-        for line in lines:
-            line_len = len(line) + 1  # +1 for newline
-            if current_len + line_len > 1000:  # leave margin
-                chunks.append("\n".join(current_chunk))
-                current_chunk = [line]
-                current_len = line_len
-            else:
-                current_chunk.append(line)
-                current_len += line_len
-        if current_chunk:
-            chunks.append("\n".join(current_chunk))
-
-        for i, chunk in enumerate(chunks):
-            field_name = name if len(chunks) == 1 else f"{name} ({i + 1}/{len(chunks)})"
-            embed.add_field(name=field_name, value=chunk, inline=False)
-
-    if pending:
-        pending_lines = [
-            f"• ${b.stake_cents / 100:.0f} {b.position.upper()} @ ${b.price_cents / 100:.2f} - {b.market_title}"
-            for b in pending
-        ]
-        add_chunked_fields(embed, f"⏳ Pending ({len(pending)})", pending_lines)
-
-    if wins:
-        wins_lines = [
-            f"• +${b.payout_cents / 100:.2f} (${b.stake_cents / 100:.0f} {b.position.upper()} @ ${b.price_cents / 100:.2f}) - {b.market_title}"
-            for b in wins
-        ]
-        add_chunked_fields(embed, f"✅ Wins ({len(wins)})", wins_lines)
-
-    if losses:
-        losses_lines = [
-            f"• -${b.stake_cents / 100:.0f} {b.position.upper()} @ ${b.price_cents / 100:.2f} - {b.market_title}"
-            for b in losses
-        ]
-        add_chunked_fields(embed, f"❌ Losses ({len(losses)})", losses_lines)
-
-    await interaction.followup.send(embed=embed, ephemeral=True)
+    page = await database.get_bets_page(player.id, PAGE_SIZE)
+    view = BetsView(player.id, year, summary, page)
+    await interaction.followup.send(embed=view.render(), view=view, ephemeral=True)
+
+
+class BetsView(discord.ui.View):
+    """One page of a player's bets under their summary, with prev/next buttons.
+
+    Pages are fetched on demand with keyset pagination, so each click reads at
+    most one page of rows.
+    """
+
+    def __init__(self, player_id: int, year: int, summary: dict, page: BetPage):
+        super().__init__(timeout=300)
+        self.player_id = player_id
+        self.year = year
+        self.summary = summary
+        self.page = page
+        self.page_number = 1
+        self.page_count = -(-summary["bet_count"] // PAGE_SIZE)
+        self._update_buttons()
+
+    def render(self) -> discord.Embed:
+        summary = self.summary
+        embed = discord.Embed(
+            title=f"📋 Your Bets ({self.year})",
+            description="\n".join(_bet_line(b) for b in self.page.bets),
+            color=discord.Color.blue(),
+        )
+        embed.add_field(
+            name="Summary",
+            value=(
+                f"Total Winnings: **${summary['total_cents'] / 100:.2f}**\n"
+                f"Biggest Win: **${summary['biggest_win_cents'] / 100:.2f}**\n"
+                f"Max Return: **${summary['max_return_cents'] / 100:.2f}**\n"
+                f"Bets Remaining: **{summary['remaining_bets']}**\n"
+                f"⏳ {summary['pending_count']} pending | "
+                f"✅ {summary['win_count']} won | "
+                f"❌ {summary['loss_count']} lost"
+            ),
+            inline=False,
+        )
+        embed.set_footer(text=f"Page {self.page_number} of {self.page_count}")
+        return embed
+
+    def _update_buttons(self):
+        self.newer.disabled = not self.page.has_newer
+        self.older.disabled = not self.page.has_older
+
+    async def _show(self, interaction: discord.Interaction, page: BetPage, step: int):
+        if page.bets:
+            self.page = page
+            self.page_number += step
+        self._update_buttons()
+        await interaction.response.edit_message(embed=self.render(), view=self)
+
+    @discord.ui.button(label="◀ Newer", style=discord.ButtonStyle.secondary)
+    async def newer(self, interaction: discord.Interaction, button: discord.ui.Button):
+        page = await database.get_bets_page(
+            self.player_id, PAGE_SIZE, newer_than=self.page.newest_key
+        )
+        await self._show(interaction, page, -1)
+
+    @discord.ui.button(label="Older ▶", style=discord.ButtonStyle.secondary)
+    async def older(self, interaction: discord.Interaction, button: discord.ui.Button):
+        page = await database.get_bets_page(
+            self.player_id, PAGE_SIZE, older_than=self.page.oldest_key
+        )
+        await self._show(interaction, page, 1)
+
+
+def _bet_line(b: Bet) -> str:
+    if b.outcome == "win":
+        return f"✅ +${b.payout_cents / 100:.2f} (${b.stake_cents / 100:.0f} {b.position.upper()} @ ${b.price_cents / 100:.2f}) - {b.market_title}"
+    if b.outcome == "loss":
+        return f"❌ -${b.stake_cents / 100:.0f} {b.position.upper()} @ ${b.price_cents / 100:.2f} - {b.market_title}"
+    return f"⏳ ${b.stake_cents / 100:.0f} {b.position.upper()} @ ${b.price_cents / 100:.2f} - {b.market_title}"
 
 
 def setup(tree: app_commands.CommandTree):
     @tree.command(name="bets", description="View your bets and their status")
+    @profiler.profiled
     async def bets_command(interaction: discord.Interaction):
         await bets(interaction)
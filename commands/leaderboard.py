@@ -3,23 +3,48 @@ from datetime import datetime
 import discord
 from discord import app_commands
 
-from services import database, resolver
+from config import RESOLVE_STALE_SECONDS, RESOLVE_STREAM_FALLBACK_SECONDS
+from services import database, profiler, resolver
+
+
+# (year, month) -> (data version, rendered message). The month is part of the
+# key because "left" counts depend on it.
+_rendered: dict[tuple[int, int], tuple[int, dict]] = {}
 
 
 async def leaderboard(interaction: discord.Interaction):
     await interaction.response.defer(thinking=True)
 
-    year = datetime.now().year
+    now = datetime.now()
+    year = now.year
+
+    # Resolution normally happens in the background; only catch up here if
+    # the background task has fallen behind. With the market stream up,
+    # settlements arrive as they happen and the polling fallback is slower.
+    await resolver.refresh_if_stale(
+        RESOLVE_STREAM_FALLBACK_SECONDS
+        if resolver.stream_connected
+        else RESOLVE_STALE_SECONDS
+    )
+
+    # Read the version before the data so a write landing mid-render
+    # invalidates what we cache
+    version = database.data_version()
+    cached = _rendered.get((year, now.month))
+    if cached and cached[0] == version:
+        message = cached[1]
+    else:
+        rankings = await database.get_leaderboard(year)
+        message = render_leaderboard(year, rankings)
+        _rendered[(year, now.month)] = (version, message)
 
-    await resolver.resolve_all_bets()
+    await interaction.followup.send(**message, ephemeral=False)
 
-    rankings = database.get_leaderboard(year)
 
+def render_leaderboard(year: int, rankings: list[dict]) -> dict:
+    """Build the followup message for the leaderboard, as send() kwargs."""
     if not rankings:
-        await interaction.followup.send(
-            f"📊 **Leaderboard {year}**\nNo players registered yet.", ephemeral=False
-        )
-        return
+        return {"content": f"📊 **Leaderboard {year}**\nNo players registered yet."}
 
     embed = discord.Embed(
         title=f"🏆 GambaBot Leaderboard {year}", color=discord.Color.gold()
@@ -77,10 +102,11 @@ async def leaderboard(interaction: discord.Interaction):
 
     embed.set_footer(text=footer_text if footer_text else None)
 
-    await interaction.followup.send(embed=embed, ephemeral=False)
+    return {"embed": embed}
 
 
 def setup(tree: app_commands.CommandTree):
     @tree.command(name="leaderboard", description="View the global betting leaderboard")
+    @profiler.profiled
     async def leaderboard_command(interaction: discord.Interaction):
         await leaderboard(interaction)
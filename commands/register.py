@@ -3,7 +3,7 @@ from datetime import datetime
 import discord
 from discord import app_commands
 
-from services import database
+from services import database, profiler
 
 
 async def register(interaction: discord.Interaction):
@@ -18,7 +18,7 @@ async def register(interaction: discord.Interaction):
         return
 
     discord_id = str(interaction.user.id)
-    existing = database.get_player(discord_id, year)
+    existing = await database.get_player(discord_id, year)
 
     if existing:
         await interaction.response.send_message(
@@ -26,7 +26,7 @@ async def register(interaction: discord.Interaction):
         )
         return
 
-    database.register_player(discord_id, year)
+    await database.register_player(discord_id, year)
 
     await interaction.response.send_message(
         f"🎰 **Welcome to GambaBot {year}!**\n"
@@ -41,5 +41,6 @@ def setup(tree: app_commands.CommandTree):
     @tree.command(
         name="register", description="Join this year's betting game (January only)"
     )
+    @profiler.profiled
     async def register_command(interaction: discord.Interaction):
         await register(interaction)
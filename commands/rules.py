@@ -1,6 +1,8 @@
 import discord
 from discord import app_commands
 
+from services import profiler
+
 
 RULES_TEXT = """
 **📋 GambaBot Rules**
@@ -43,5 +45,6 @@ async def rules(interaction: discord.Interaction):
 
 def setup(tree: app_commands.CommandTree):
     @tree.command(name="rules", description="How to play GambaBot")
+    @profiler.profiled
     async def rules_command(interaction: discord.Interaction):
         await rules(interaction)
@@ -5,3 +5,64 @@ load_dotenv()
 
 DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
 DATABASE_PATH = os.getenv("DATABASE_PATH", "gambabot.db")
+# Pooled SQLite reader connections (in addition to the single writer)
+DB_READERS = int(os.getenv("DB_READERS", "4"))
+# Rows per batch when streaming bets out of SQLite
+DB_FETCH_BATCH_SIZE = int(os.getenv("DB_FETCH_BATCH_SIZE", "500"))
+
+# Max number of distinct markets checked concurrently during a resolution sweep
+RESOLVE_CONCURRENCY = int(os.getenv("RESOLVE_CONCURRENCY", "8"))
+# Market ids per bulk Gamma API lookup during a resolution sweep
+RESOLVE_CHUNK_SIZE = int(os.getenv("RESOLVE_CHUNK_SIZE", "20"))
+
+# Shared Gamma API client: connection pool size and per-request timeout
+POLYMARKET_MAX_CONNECTIONS = int(os.getenv("POLYMARKET_MAX_CONNECTIONS", "20"))
+POLYMARKET_TIMEOUT_SECONDS = float(os.getenv("POLYMARKET_TIMEOUT_SECONDS", "10"))
+
+# Background resolution: sweep interval, and the age after which /leaderboard
+# triggers a sweep itself because the background task has fallen behind
+RESOLVE_INTERVAL_SECONDS = float(os.getenv("RESOLVE_INTERVAL_SECONDS", "120"))
+RESOLVE_STALE_SECONDS = float(os.getenv("RESOLVE_STALE_SECONDS", "600"))
+# Markets within this long of their end date (or past it) are checked every
+# sweep; earlier than that, checks back off exponentially up to the maximum
+RESOLVE_NEAR_END_SECONDS = float(os.getenv("RESOLVE_NEAR_END_SECONDS", "86400"))
+RESOLVE_MAX_BACKOFF_SECONDS = float(os.getenv("RESOLVE_MAX_BACKOFF_SECONDS", "21600"))
+# Optional websocket feed of market events that triggers resolution as soon as
+# a market settles (empty disables). While it is connected, polling sweeps
+# (including the /leaderboard catch-up) fall back to every
+# RESOLVE_STREAM_FALLBACK_SECONDS; the subscribed market set is refreshed every
+# RESOLVE_STREAM_REFRESH_SECONDS.
+RESOLVE_STREAM_URL = os.getenv("RESOLVE_STREAM_URL", "")
+RESOLVE_STREAM_FALLBACK_SECONDS = float(
+    os.getenv("RESOLVE_STREAM_FALLBACK_SECONDS", "1800")
+)
+RESOLVE_STREAM_REFRESH_SECONDS = float(
+    os.getenv("RESOLVE_STREAM_REFRESH_SECONDS", "60")
+)
+
+# Gamma API market cache: prices expire quickly, slug/title mappings last longer
+MARKET_CACHE_SIZE = int(os.getenv("MARKET_CACHE_SIZE", "1024"))
+MARKET_PRICE_TTL_SECONDS = float(os.getenv("MARKET_PRICE_TTL_SECONDS", "15"))
+MARKET_METADATA_TTL_SECONDS = float(os.getenv("MARKET_METADATA_TTL_SECONDS", "3600"))
+
+# Gamma API client-side rate limit, retries and circuit breaker
+POLYMARKET_RATE_PER_SECOND = float(os.getenv("POLYMARKET_RATE_PER_SECOND", "10"))
+POLYMARKET_BURST = float(os.getenv("POLYMARKET_BURST", "20"))
+POLYMARKET_MAX_RETRIES = int(os.getenv("POLYMARKET_MAX_RETRIES", "3"))
+POLYMARKET_BREAKER_THRESHOLD = int(os.getenv("POLYMARKET_BREAKER_THRESHOLD", "5"))
+POLYMARKET_BREAKER_RESET_SECONDS = float(
+    os.getenv("POLYMARKET_BREAKER_RESET_SECONDS", "30")
+)
+
+# Prometheus metrics at http://METRICS_HOST:METRICS_PORT/metrics; 0 disables
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+
+# Log interactions slower than PROFILE_SLOW_SECONDS (0 disables) with a
+# SQLite/Gamma timing breakdown; PROFILE_SAMPLE_RATE of them also run under
+# cProfile
+PROFILE_SLOW_SECONDS = float(os.getenv("PROFILE_SLOW_SECONDS", "0"))
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_LOG_PATH = os.getenv("PROFILE_LOG_PATH", "slow_interactions.log")
+PROFILE_LOG_MAX_BYTES = int(os.getenv("PROFILE_LOG_MAX_BYTES", "5000000"))
+PROFILE_LOG_BACKUPS = int(os.getenv("PROFILE_LOG_BACKUPS", "3"))
@@ -0,0 +1,58 @@
+import argparse
+import asyncio
+
+from services import database, polymarket, resolver
+
+
+async def rebuild_standings():
+    count = await database.rebuild_standings()
+    print(f"Rebuilt standings for {count} player(s).")
+
+
+async def resolve_all():
+    try:
+        count = await resolver.resolve_all_bets()
+    finally:
+        await polymarket.get_client().close()
+    print(f"Resolved {count} bet(s).")
+
+
+async def migrations():
+    for version, name, applied_at in await database.get_applied_migrations():
+        print(f"{version:03d} {name} (applied {applied_at})")
+
+
+COMMANDS = {
+    "rebuild-standings": (
+        rebuild_standings,
+        "Recompute the player_standings table from bets",
+    ),
+    "resolve-all": (
+        resolve_all,
+        "Check every market with a pending bet now, ignoring the schedule",
+    ),
+    "migrations": (
+        migrations,
+        "Apply pending migrations and list those recorded",
+    ),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GambaBot maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, (_, help_text) in COMMANDS.items():
+        subparsers.add_parser(name, help=help_text)
+    args = parser.parse_args()
+
+    for name in database.init_db():
+        print(f"Applied migration {name}")
+    try:
+        command, _ = COMMANDS[args.command]
+        asyncio.run(command())
+    finally:
+        database.close_db()
+
+
+if __name__ == "__main__":
+    main()
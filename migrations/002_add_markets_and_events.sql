@@ -0,0 +1,24 @@
+-- Migration: Persistent record of market metadata, closures and resolutions,
+-- plus event slug -> single market slug lookups (NULL for multi-outcome events)
+
+CREATE TABLE IF NOT EXISTS markets (
+    platform TEXT NOT NULL,
+    market_id TEXT NOT NULL,
+    slug TEXT,
+    title TEXT,
+    outcomes TEXT,
+    closed INTEGER NOT NULL DEFAULT 0,
+    resolution TEXT,
+    resolved_at TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (platform, market_id)
+);
+
+CREATE TABLE IF NOT EXISTS events (
+    platform TEXT NOT NULL,
+    slug TEXT NOT NULL,
+    market_slug TEXT,
+    PRIMARY KEY (platform, slug)
+);
+
+CREATE INDEX IF NOT EXISTS idx_markets_slug ON markets(platform, slug);
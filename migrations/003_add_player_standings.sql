@@ -0,0 +1,54 @@
+-- Migration: Materialized per-player leaderboard totals, maintained by
+-- triggers on players and bets. Existing rows are filled in by 004.
+
+CREATE TABLE IF NOT EXISTS player_standings (
+    player_id INTEGER PRIMARY KEY,
+    year INTEGER NOT NULL,
+    total_cents INTEGER NOT NULL DEFAULT 0,
+    biggest_win_cents INTEGER NOT NULL DEFAULT 0,
+    pending_potential_cents INTEGER NOT NULL DEFAULT 0,
+    pending_count INTEGER NOT NULL DEFAULT 0,
+    month_key INTEGER,
+    bets_this_month INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (player_id) REFERENCES players(id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_standings_rank ON player_standings(year, total_cents DESC, biggest_win_cents DESC);
+
+CREATE TRIGGER IF NOT EXISTS standings_on_register AFTER INSERT ON players
+BEGIN
+    INSERT OR IGNORE INTO player_standings (player_id, year) VALUES (NEW.id, NEW.year);
+END;
+
+CREATE TRIGGER IF NOT EXISTS standings_on_bet AFTER INSERT ON bets
+BEGIN
+    UPDATE player_standings SET
+        total_cents = total_cents
+            + CASE WHEN NEW.outcome = 'win' THEN NEW.payout_cents ELSE 0 END,
+        biggest_win_cents = MAX(biggest_win_cents,
+            CASE WHEN NEW.outcome = 'win' THEN NEW.payout_cents ELSE 0 END),
+        pending_potential_cents = pending_potential_cents
+            + CASE WHEN NEW.outcome IS NULL THEN NEW.stake_cents * 100 / NEW.price_cents ELSE 0 END,
+        pending_count = pending_count + (NEW.outcome IS NULL),
+        bets_this_month = CASE
+            WHEN month_key = NEW.placed_year * 12 + NEW.placed_month THEN bets_this_month + 1
+            WHEN month_key > NEW.placed_year * 12 + NEW.placed_month THEN bets_this_month
+            ELSE 1
+        END,
+        month_key = MAX(COALESCE(month_key, 0), NEW.placed_year * 12 + NEW.placed_month)
+    WHERE player_id = NEW.player_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS standings_on_resolve AFTER UPDATE OF outcome ON bets
+WHEN OLD.outcome IS NULL AND NEW.outcome IS NOT NULL
+BEGIN
+    UPDATE player_standings SET
+        total_cents = total_cents
+            + CASE WHEN NEW.outcome = 'win' THEN NEW.payout_cents ELSE 0 END,
+        biggest_win_cents = MAX(biggest_win_cents,
+            CASE WHEN NEW.outcome = 'win' THEN NEW.payout_cents ELSE 0 END),
+        pending_potential_cents = pending_potential_cents
+            - OLD.stake_cents * 100 / OLD.price_cents,
+        pending_count = pending_count - 1
+    WHERE player_id = NEW.player_id;
+END;
@@ -0,0 +1,46 @@
+"""Migration: Fill in player_standings for players registered before 003.
+
+Runs in batches of players, committing each one, so a large table is never
+held under a single long write transaction. Re-running recomputes the same
+rows, so an interrupted backfill is safe to resume.
+"""
+
+from services.migrations import backfill
+
+TRANSACTIONAL = False
+
+_UPSERT_STANDINGS = """
+    INSERT OR REPLACE INTO player_standings (
+        player_id, year, total_cents, biggest_win_cents,
+        pending_potential_cents, pending_count, month_key, bets_this_month
+    )
+    SELECT
+        p.id,
+        p.year,
+        COALESCE(SUM(CASE WHEN b.outcome = 'win' THEN b.payout_cents ELSE 0 END), 0),
+        COALESCE(MAX(CASE WHEN b.outcome = 'win' THEN b.payout_cents ELSE 0 END), 0),
+        COALESCE(SUM(CASE WHEN b.outcome IS NULL THEN b.stake_cents * 100 / b.price_cents ELSE 0 END), 0),
+        COUNT(CASE WHEN b.id IS NOT NULL AND b.outcome IS NULL THEN 1 END),
+        MAX(b.placed_year * 12 + b.placed_month),
+        (
+            SELECT COUNT(*) FROM bets m
+            WHERE m.player_id = p.id
+              AND m.placed_year * 12 + m.placed_month = MAX(b.placed_year * 12 + b.placed_month)
+        )
+    FROM players p
+    LEFT JOIN bets b ON p.id = b.player_id
+    WHERE p.id BETWEEN ? AND ?
+    GROUP BY p.id
+"""
+
+
+def upgrade(conn):
+    def apply(conn, rows):
+        conn.execute(_UPSERT_STANDINGS, (rows[0][0], rows[-1][0]))
+
+    backfill(
+        conn,
+        "SELECT id FROM players WHERE id > ? ORDER BY id LIMIT ?",
+        apply,
+        batch_size=500,
+    )
@@ -0,0 +1,47 @@
+"""Migration: Composite, covering and partial indexes matching the hot query
+shapes, replacing the original single-column bet indexes.
+
+The unique (player_id, market_id) index can't be built while a player has two
+bets on the same market, so those are looked for first and reported by id.
+"""
+
+import sqlite3
+
+# How many duplicated (player, market) pairs to list in the error
+MAX_LISTED = 20
+
+_DUPLICATES = """
+    SELECT player_id, market_id, GROUP_CONCAT(id, ', ')
+    FROM bets
+    GROUP BY player_id, market_id
+    HAVING COUNT(*) > 1
+    ORDER BY player_id, market_id
+"""
+
+_STATEMENTS = [
+    "CREATE INDEX IF NOT EXISTS idx_bets_player_month ON bets(player_id, placed_year, placed_month)",
+    "CREATE INDEX IF NOT EXISTS idx_bets_player_placed ON bets(player_id, placed_at)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_bets_player_market ON bets(player_id, market_id)",
+    "CREATE INDEX IF NOT EXISTS idx_bets_unresolved ON bets(platform, market_id) WHERE outcome IS NULL",
+    "DROP INDEX IF EXISTS idx_bets_player",
+    "DROP INDEX IF EXISTS idx_bets_outcome",
+]
+
+
+def upgrade(conn):
+    duplicates = conn.execute(_DUPLICATES).fetchall()
+    if duplicates:
+        listed = [
+            f"  player {player_id}, market {market_id}: bets {bet_ids}"
+            for player_id, market_id, bet_ids in duplicates[:MAX_LISTED]
+        ]
+        if len(duplicates) > MAX_LISTED:
+            listed.append(f"  ... and {len(duplicates) - MAX_LISTED} more")
+        raise sqlite3.IntegrityError(
+            "Can't add the one-bet-per-market index: "
+            f"{len(duplicates)} player/market pair(s) have more than one bet. "
+            "Delete the extra bets, then restart the bot.\n" + "\n".join(listed)
+        )
+
+    for statement in _STATEMENTS:
+        conn.execute(statement)
@@ -0,0 +1,4 @@
+-- Migration: Record each market's scheduled end date, used to decide how
+-- often the resolver polls it. Filled in as markets are next fetched.
+
+ALTER TABLE markets ADD COLUMN end_date TIMESTAMP;
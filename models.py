@@ -1,18 +1,32 @@
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
+# Models are slotted and immutable. Timestamps are kept as the text SQLite
+# stores and only parsed when read, since most code paths never look at them.
 
-@dataclass
+
+def _parse_timestamp(raw: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(raw) if raw else None
+
+
+@dataclass(slots=True, frozen=True)
 class Player:
     id: int
     discord_id: str
     year: int
-    registered_at: datetime
+    registered_at_raw: str
 
+    @property
+    def registered_at(self) -> datetime:
+        return _parse_timestamp(self.registered_at_raw)
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class Bet:
+    """A bet. Field order matches the column lists of the bet queries in
+    services/database.py, so a row decodes as Bet(*row)."""
+
     id: int
     player_id: int
     platform: str
@@ -21,15 +35,40 @@ class Bet:
     position: str
     price_cents: int
     stake_cents: int
-    placed_at: datetime
+    placed_at_raw: str
     placed_year: int
     placed_month: int
-    resolved_at: Optional[datetime]
+    resolved_at_raw: Optional[str]
     outcome: Optional[str]
     payout_cents: Optional[int]
 
+    @property
+    def placed_at(self) -> datetime:
+        return _parse_timestamp(self.placed_at_raw)
+
+    @property
+    def resolved_at(self) -> Optional[datetime]:
+        return _parse_timestamp(self.resolved_at_raw)
+
+
+@dataclass(slots=True, frozen=True)
+class BetPage:
+    """A page of a player's bets, newest first, and whether more lie either side."""
+
+    bets: list[Bet]
+    has_newer: bool
+    has_older: bool
+
+    @property
+    def newest_key(self) -> tuple[str, int]:
+        return (self.bets[0].placed_at_raw, self.bets[0].id)
+
+    @property
+    def oldest_key(self) -> tuple[str, int]:
+        return (self.bets[-1].placed_at_raw, self.bets[-1].id)
+
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class MarketInfo:
     platform: str
     market_id: str
@@ -38,3 +77,38 @@ class MarketInfo:
     no_cents: int
     resolved: bool
     resolution: Optional[str]
+    slug: Optional[str] = None
+    outcomes: Optional[list[str]] = None
+    end_date: Optional[datetime] = None
+
+
+@dataclass(slots=True, frozen=True)
+class Market:
+    """What we've persisted about a market: metadata plus its final state."""
+
+    platform: str
+    market_id: str
+    slug: Optional[str]
+    title: Optional[str]
+    outcomes: Optional[list[str]]
+    closed: bool
+    resolution: Optional[str]
+    resolved_at_raw: Optional[str]
+    end_date_raw: Optional[str] = None
+
+    @property
+    def resolved_at(self) -> Optional[datetime]:
+        return _parse_timestamp(self.resolved_at_raw)
+
+    @property
+    def end_date(self) -> Optional[datetime]:
+        return _parse_timestamp(self.end_date_raw)
+
+
+@dataclass(slots=True, frozen=True)
+class BetPlacement:
+    """Outcome of placing a bet: the new bet, or why it was refused."""
+
+    status: Literal["placed", "not_registered", "no_bets_remaining", "duplicate"]
+    bet: Optional[Bet] = None
+    remaining: int = 0
@@ -1,3 +1,7 @@
+-- Full current schema, applied as-is to a fresh database. Existing databases
+-- are upgraded by the numbered files in migrations/; every migration must
+-- also be reflected here.
+
 CREATE TABLE IF NOT EXISTS players (
     id INTEGER PRIMARY KEY,
     discord_id TEXT NOT NULL,
@@ -24,6 +28,97 @@ CREATE TABLE IF NOT EXISTS bets (
     FOREIGN KEY (player_id) REFERENCES players(id)
 );
 
-CREATE INDEX IF NOT EXISTS idx_bets_player ON bets(player_id);
-CREATE INDEX IF NOT EXISTS idx_bets_outcome ON bets(outcome);
+-- Per-player running totals behind /leaderboard, kept current by the
+-- triggers below inside the same transaction as each bet write. month_key is
+-- placed_year * 12 + placed_month of the player's latest betting month, and
+-- bets_this_month counts bets placed in that month.
+CREATE TABLE IF NOT EXISTS player_standings (
+    player_id INTEGER PRIMARY KEY,
+    year INTEGER NOT NULL,
+    total_cents INTEGER NOT NULL DEFAULT 0,
+    biggest_win_cents INTEGER NOT NULL DEFAULT 0,
+    pending_potential_cents INTEGER NOT NULL DEFAULT 0,
+    pending_count INTEGER NOT NULL DEFAULT 0,
+    month_key INTEGER,
+    bets_this_month INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (player_id) REFERENCES players(id)
+);
+
+-- Persistent record of market facts that never change once observed, so
+-- restarts don't refetch them: metadata, closed flag and final resolution.
+-- end_date is the scheduled end from the Gamma API and drives how often the
+-- resolver checks the market.
+CREATE TABLE IF NOT EXISTS markets (
+    platform TEXT NOT NULL,
+    market_id TEXT NOT NULL,
+    slug TEXT,
+    title TEXT,
+    outcomes TEXT,
+    closed INTEGER NOT NULL DEFAULT 0,
+    resolution TEXT,
+    resolved_at TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    end_date TIMESTAMP,
+    PRIMARY KEY (platform, market_id)
+);
+
+-- Event slug -> its single yes/no market slug; NULL market_slug means the
+-- event is multi-outcome and can't be bet on without picking a market.
+CREATE TABLE IF NOT EXISTS events (
+    platform TEXT NOT NULL,
+    slug TEXT NOT NULL,
+    market_slug TEXT,
+    PRIMARY KEY (platform, slug)
+);
+
+-- Indexes match the query shapes in services/database.py;
+-- tests/test_query_plans.py fails if any of them falls back to a table scan.
+-- Monthly quota counts (covering)
+CREATE INDEX IF NOT EXISTS idx_bets_player_month ON bets(player_id, placed_year, placed_month);
+-- A player's bets, newest first
+CREATE INDEX IF NOT EXISTS idx_bets_player_placed ON bets(player_id, placed_at);
+-- One bet per player per market
+CREATE UNIQUE INDEX IF NOT EXISTS idx_bets_player_market ON bets(player_id, market_id);
+-- Pending bets only: stays small however much history accumulates
+CREATE INDEX IF NOT EXISTS idx_bets_unresolved ON bets(platform, market_id) WHERE outcome IS NULL;
 CREATE INDEX IF NOT EXISTS idx_players_year ON players(year);
+CREATE INDEX IF NOT EXISTS idx_markets_slug ON markets(platform, slug);
+CREATE INDEX IF NOT EXISTS idx_standings_rank ON player_standings(year, total_cents DESC, biggest_win_cents DESC);
+
+CREATE TRIGGER IF NOT EXISTS standings_on_register AFTER INSERT ON players
+BEGIN
+    INSERT OR IGNORE INTO player_standings (player_id, year) VALUES (NEW.id, NEW.year);
+END;
+
+CREATE TRIGGER IF NOT EXISTS standings_on_bet AFTER INSERT ON bets
+BEGIN
+    UPDATE player_standings SET
+        total_cents = total_cents
+            + CASE WHEN NEW.outcome = 'win' THEN NEW.payout_cents ELSE 0 END,
+        biggest_win_cents = MAX(biggest_win_cents,
+            CASE WHEN NEW.outcome = 'win' THEN NEW.payout_cents ELSE 0 END),
+        pending_potential_cents = pending_potential_cents
+            + CASE WHEN NEW.outcome IS NULL THEN NEW.stake_cents * 100 / NEW.price_cents ELSE 0 END,
+        pending_count = pending_count + (NEW.outcome IS NULL),
+        bets_this_month = CASE
+            WHEN month_key = NEW.placed_year * 12 + NEW.placed_month THEN bets_this_month + 1
+            WHEN month_key > NEW.placed_year * 12 + NEW.placed_month THEN bets_this_month
+            ELSE 1
+        END,
+        month_key = MAX(COALESCE(month_key, 0), NEW.placed_year * 12 + NEW.placed_month)
+    WHERE player_id = NEW.player_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS standings_on_resolve AFTER UPDATE OF outcome ON bets
+WHEN OLD.outcome IS NULL AND NEW.outcome IS NOT NULL
+BEGIN
+    UPDATE player_standings SET
+        total_cents = total_cents
+            + CASE WHEN NEW.outcome = 'win' THEN NEW.payout_cents ELSE 0 END,
+        biggest_win_cents = MAX(biggest_win_cents,
+            CASE WHEN NEW.outcome = 'win' THEN NEW.payout_cents ELSE 0 END),
+        pending_potential_cents = pending_potential_cents
+            - OLD.stake_cents * 100 / OLD.price_cents,
+        pending_count = pending_count - 1
+    WHERE player_id = NEW.player_id;
+END;
@@ -1,27 +1,253 @@
+import asyncio
+import functools
+import json
+import queue
 import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
-from pathlib import Path
-from typing import Optional
+from itertools import starmap
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Concatenate,
+    ContextManager,
+    Iterator,
+    Optional,
+    ParamSpec,
+    TypeVar,
+)
+
+from models import Player, Bet, BetPage, BetPlacement, Market, MarketInfo
+from config import DATABASE_PATH, DB_FETCH_BATCH_SIZE, DB_READERS
+from services import metrics, migrations, profiler
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+# Applied to every pooled connection. journal_mode=WAL persists in the file;
+# the rest are per-connection.
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=5000",
+)
+
+
+class ConnectionPool:
+    """One writer connection plus a fixed set of reader connections.
+
+    Under WAL, readers see the last committed state and never wait for the
+    writer, so reads like /leaderboard don't block behind resolution writes.
+    Writes are serialized through the single writer.
+
+    Long-lived streams get a connection of their own (`snapshot`) rather than
+    holding a pooled reader between batches.
+    """
+
+    def __init__(self, path: str, readers: int = DB_READERS):
+        self.path = path
+        self._writer = self._connect()
+        self._writer_lock = threading.Lock()
+        self._readers: queue.Queue[sqlite3.Connection] = queue.Queue()
+        for _ in range(readers):
+            self._readers.put(self._connect())
+        self.readers = readers
+        self.size = readers + 1
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for pragma in _PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
+    @contextmanager
+    def snapshot(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        with self._writer_lock:
+            try:
+                yield self._writer
+            except BaseException:
+                self._writer.rollback()
+                raise
+
+    def close(self):
+        with self._writer_lock:
+            self._writer.close()
+        while not self._readers.empty():
+            self._readers.get_nowait().close()
+
+
+_pool: Optional[ConnectionPool] = None
+_read_executor: Optional[ThreadPoolExecutor] = None
+_write_executor: Optional[ThreadPoolExecutor] = None
+
+# Bumped by every write that can change the leaderboard, so callers can cache
+# derived views until it moves. Only touched under the writer lock.
+_data_version = 0
+
+
+def data_version() -> int:
+    return _data_version
+
+
+def _bump_data_version():
+    global _data_version
+    _data_version += 1
+
+
+def get_pool() -> ConnectionPool:
+    global _pool, _read_executor, _write_executor
+    if _pool is None:
+        _pool = ConnectionPool(DATABASE_PATH)
+        # Queries run on these threads so a slow disk or a locked database
+        # never blocks the event loop (and with it the gateway heartbeat).
+        # One thread per reader, so a read never waits for a connection, and
+        # a single writer thread, so queued writes waiting on the writer can
+        # never occupy the threads reads need.
+        _read_executor = ThreadPoolExecutor(
+            max_workers=_pool.readers, thread_name_prefix="gambabot-db-read"
+        )
+        _write_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="gambabot-db-write"
+        )
+    return _pool
+
+
+def close_db():
+    global _pool, _read_executor, _write_executor
+    for executor in (_read_executor, _write_executor):
+        if executor is not None:
+            executor.shutdown()
+    _read_executor = _write_executor = None
+    if _pool is not None:
+        _pool.close()
+        _pool = None
+
+
+def _query(
+    checkout: Callable[[ConnectionPool], ContextManager[sqlite3.Connection]],
+    executor: Callable[[], Optional[ThreadPoolExecutor]],
+) -> Callable[
+    [Callable[Concatenate[sqlite3.Connection, P], T]], Callable[P, Awaitable[T]]
+]:
+    def decorator(
+        func: Callable[Concatenate[sqlite3.Connection, P], T],
+    ) -> Callable[P, Awaitable[T]]:
+        def run(*args, **kwargs) -> T:
+            with checkout(get_pool()) as conn:
+                with _timed(func.__name__):
+                    return func(conn, *args, **kwargs)
+
+        @functools.wraps(func)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+            get_pool()
+            loop = asyncio.get_running_loop()
+            with profiler.span("sqlite", func.__name__):
+                return await loop.run_in_executor(
+                    executor(), functools.partial(run, *args, **kwargs)
+                )
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def _timed(query: str) -> Iterator[None]:
+    """Record a query's duration (and failure, if it raises) for /metrics."""
+    if not metrics.enabled():
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        metrics.QUERY_ERRORS.inc(query)
+        raise
+    finally:
+        metrics.QUERY_SECONDS.observe(time.perf_counter() - start, query)
+
+
+# Turn `func(conn, ...)` into an awaitable `func(...)` run on a reader thread
+# with a pooled reader, or on the writer thread with the writer connection.
+_reads = _query(ConnectionPool.reader, lambda: _read_executor)
+_writes = _query(ConnectionPool.writer, lambda: _write_executor)
+
+
+def _streams(
+    func: Callable[Concatenate[sqlite3.Connection, P], Iterator[list[T]]],
+) -> Callable[P, AsyncIterator[list[T]]]:
+    """Turn a generator of row batches into an async stream of those batches.
+
+    The stream opens its own connection for its lifetime (so it reads one
+    consistent snapshot without tying up a pooled reader between batches)
+    and each batch is fetched on a reader thread.
+    """
 
-from models import Player, Bet
-from config import DATABASE_PATH
+    @functools.wraps(func)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> AsyncIterator[list[T]]:
+        pool = get_pool()
+        loop = asyncio.get_running_loop()
 
+        def run(call, *call_args):
+            return loop.run_in_executor(_read_executor, call, *call_args)
 
-def get_connection() -> sqlite3.Connection:
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+        def fetch(batches: Iterator[list[T]]) -> Optional[list[T]]:
+            with _timed(func.__name__):
+                return next(batches, None)
 
+        checkout = pool.snapshot()
+        conn = await run(checkout.__enter__)
+        try:
+            batches = await run(functools.partial(func, conn, *args, **kwargs))
+            try:
+                while (batch := await run(fetch, batches)) is not None:
+                    yield batch
+            finally:
+                await run(batches.close)
+        finally:
+            checkout.__exit__(None, None, None)
 
-def init_db():
-    schema_path = Path(__file__).parent.parent / "schema.sql"
-    with open(schema_path) as f:
-        schema = f.read()
+    return wrapper
 
-    conn = get_connection()
-    conn.executescript(schema)
-    conn.commit()
-    conn.close()
+
+def init_db() -> list[str]:
+    """Create or upgrade the schema. Returns the migrations that were applied."""
+    with get_pool().writer() as conn:
+        applied = migrations.migrate(conn)
+    return [str(migration) for migration in applied]
+
+
+@_reads
+def get_applied_migrations(conn: sqlite3.Connection) -> list[tuple[int, str, str]]:
+    return [
+        (row["version"], row["name"], row["applied_at"])
+        for row in conn.execute(
+            "SELECT version, name, applied_at FROM schema_migrations ORDER BY version"
+        )
+    ]
 
 
 def get_bet_stake(month: int) -> int:
@@ -39,95 +265,312 @@ def get_bet_stake(month: int) -> int:
         return 400
 
 
-def get_player(discord_id: str, year: int) -> Optional[Player]:
-    conn = get_connection()
-    row = conn.execute(
-        "SELECT * FROM players WHERE discord_id = ? AND year = ?", (discord_id, year)
+@_reads
+def get_player(
+    conn: sqlite3.Connection, discord_id: str, year: int
+) -> Optional[Player]:
+    row = _tuples(
+        conn,
+        "SELECT id, discord_id, year, registered_at FROM players WHERE discord_id = ? AND year = ?",
+        (discord_id, year),
     ).fetchone()
-    conn.close()
-
-    if row:
-        return Player(
-            id=row["id"],
-            discord_id=row["discord_id"],
-            year=row["year"],
-            registered_at=datetime.fromisoformat(row["registered_at"]),
-        )
-    return None
+    return Player(*row) if row else None
 
 
-def register_player(discord_id: str, year: int) -> Player:
-    conn = get_connection()
+@_writes
+def register_player(conn: sqlite3.Connection, discord_id: str, year: int) -> Player:
     cursor = conn.execute(
         "INSERT INTO players (discord_id, year) VALUES (?, ?)", (discord_id, year)
     )
     player_id = cursor.lastrowid
     conn.commit()
-    conn.close()
+    _bump_data_version()
 
     return Player(
-        id=player_id, discord_id=discord_id, year=year, registered_at=datetime.now()
+        id=player_id,
+        discord_id=discord_id,
+        year=year,
+        registered_at_raw=datetime.now().isoformat(),
     )
 
 
-def get_bets_for_player(player_id: int) -> list[Bet]:
-    conn = get_connection()
-    rows = conn.execute(
-        "SELECT * FROM bets WHERE player_id = ? ORDER BY placed_at DESC", (player_id,)
+@_reads
+def get_bets_for_player(conn: sqlite3.Connection, player_id: int) -> list[Bet]:
+    return [bet for batch in _iter_bets_for_player(conn, player_id) for bet in batch]
+
+
+@_streams
+def stream_bets_for_player(
+    conn: sqlite3.Connection, player_id: int, batch_size: int = DB_FETCH_BATCH_SIZE
+) -> Iterator[list[Bet]]:
+    """A player's bets, newest first, in batches of `batch_size`."""
+    return _iter_bets_for_player(conn, player_id, batch_size)
+
+
+def _iter_bets_for_player(
+    conn: sqlite3.Connection, player_id: int, batch_size: int = DB_FETCH_BATCH_SIZE
+) -> Iterator[list[Bet]]:
+    cursor = _tuples(
+        conn,
+        """
+        SELECT id, player_id, platform, market_id, market_title, position,
+               price_cents, stake_cents, placed_at, placed_year, placed_month,
+               resolved_at, outcome, payout_cents
+        FROM bets WHERE player_id = ? ORDER BY placed_at DESC
+        """,
+        (player_id,),
+    )
+    return _batches(cursor, Bet, batch_size)
+
+
+@_reads
+def get_bet_summary(conn: sqlite3.Connection, player_id: int) -> dict:
+    """A player's totals for /bets, aggregated in one query."""
+    now = datetime.now()
+    row = conn.execute(
+        """
+        SELECT
+            COUNT(*) AS bet_count,
+            COUNT(CASE WHEN outcome IS NULL THEN 1 END) AS pending_count,
+            COUNT(CASE WHEN outcome = 'win' THEN 1 END) AS win_count,
+            COUNT(CASE WHEN outcome = 'loss' THEN 1 END) AS loss_count,
+            COALESCE(SUM(CASE WHEN outcome = 'win' THEN payout_cents END), 0) AS total_cents,
+            COALESCE(MAX(CASE WHEN outcome = 'win' THEN payout_cents END), 0) AS biggest_win_cents,
+            COALESCE(SUM(CASE WHEN outcome IS NULL THEN stake_cents * 100 / price_cents END), 0)
+                AS pending_potential_cents,
+            COUNT(CASE WHEN placed_year = ? AND placed_month = ? THEN 1 END) AS used_this_month
+        FROM bets
+        WHERE player_id = ?
+        """,
+        (now.year, now.month, player_id),
+    ).fetchone()
+
+    return {
+        "bet_count": row["bet_count"],
+        "pending_count": row["pending_count"],
+        "win_count": row["win_count"],
+        "loss_count": row["loss_count"],
+        "total_cents": row["total_cents"],
+        "biggest_win_cents": row["biggest_win_cents"],
+        "max_return_cents": row["total_cents"] + row["pending_potential_cents"],
+        "remaining_bets": max(0, monthly_allowance(now.month) - row["used_this_month"]),
+    }
+
+
+@_reads
+def get_bets_page(
+    conn: sqlite3.Connection,
+    player_id: int,
+    limit: int,
+    older_than: Optional[tuple[str, int]] = None,
+    newer_than: Optional[tuple[str, int]] = None,
+) -> BetPage:
+    """One page of a player's bets, newest first.
+
+    Keyset-paginated on (placed_at, id): pass the key of the last bet shown
+    as `older_than` for the next page, or of the first as `newer_than` for the
+    previous one. Each page reads at most `limit + 1` rows however long the
+    history is.
+    """
+    if newer_than is not None:
+        rows = _tuples(
+            conn,
+            """
+            SELECT id, player_id, platform, market_id, market_title, position,
+                   price_cents, stake_cents, placed_at, placed_year, placed_month,
+                   resolved_at, outcome, payout_cents
+            FROM bets
+            WHERE player_id = ? AND (placed_at, id) > (?, ?)
+            ORDER BY placed_at, id
+            LIMIT ?
+            """,
+            (player_id, *newer_than, limit + 1),
+        ).fetchall()
+        more = len(rows) > limit
+        bets = list(starmap(Bet, rows[:limit]))
+        bets.reverse()
+        return BetPage(bets=bets, has_newer=more, has_older=True)
+
+    rows = _tuples(
+        conn,
+        """
+        SELECT id, player_id, platform, market_id, market_title, position,
+               price_cents, stake_cents, placed_at, placed_year, placed_month,
+               resolved_at, outcome, payout_cents
+        FROM bets
+        WHERE player_id = ? AND (placed_at, id) < (?, ?)
+        ORDER BY placed_at DESC, id DESC
+        LIMIT ?
+        """,
+        (player_id, *(older_than or _NEWEST_KEY), limit + 1),
     ).fetchall()
-    conn.close()
+    return BetPage(
+        bets=list(starmap(Bet, rows[:limit])),
+        has_newer=older_than is not None,
+        has_older=len(rows) > limit,
+    )
 
-    return [_row_to_bet(row) for row in rows]
 
+# Sorts after every real (placed_at, id) key
+_NEWEST_KEY = ("9999-12-31", 0)
 
-def has_bet_on_market(player_id: int, market_id: str) -> bool:
-    conn = get_connection()
+
+@_reads
+def has_bet_on_market(conn: sqlite3.Connection, player_id: int, market_id: str) -> bool:
     row = conn.execute(
         "SELECT 1 FROM bets WHERE player_id = ? AND market_id = ? LIMIT 1",
         (player_id, market_id),
     ).fetchone()
-    conn.close()
     return row is not None
 
 
-def get_bets_used_in_month(player_id: int, year: int, month: int) -> int:
-    conn = get_connection()
+@_reads
+def get_bets_used_in_month(
+    conn: sqlite3.Connection, player_id: int, year: int, month: int
+) -> int:
+    return _count_bets_in_month(conn, player_id, year, month)
+
+
+@_reads
+def get_bets_used_in_january(conn: sqlite3.Connection, player_id: int) -> int:
+    return _count_bets_in_month(conn, player_id, datetime.now().year, 1)
+
+
+@_reads
+def get_remaining_bets(conn: sqlite3.Connection, player_id: int) -> int:
+    now = datetime.now()
+    used = _count_bets_in_month(conn, player_id, now.year, now.month)
+    return max(0, monthly_allowance(now.month) - used)
+
+
+@_reads
+def get_remaining_bets_for(
+    conn: sqlite3.Connection, discord_id: str, year: int
+) -> Optional[int]:
+    """Remaining bets this month for a Discord user, or None if unregistered."""
+    now = datetime.now()
+    row = conn.execute(
+        """
+        SELECT
+            (SELECT COUNT(*) FROM bets b
+             WHERE b.player_id = p.id AND b.placed_year = ? AND b.placed_month = ?) AS used
+        FROM players p
+        WHERE p.discord_id = ? AND p.year = ?
+        """,
+        (now.year, now.month, discord_id, year),
+    ).fetchone()
+    if row is None:
+        return None
+    return max(0, monthly_allowance(now.month) - row["used"])
+
+
+def monthly_allowance(month: int) -> int:
+    """Bets a player may place in a month: 16 in January, 1 otherwise."""
+    return 16 if month == 1 else 1
+
+
+def _count_bets_in_month(
+    conn: sqlite3.Connection, player_id: int, year: int, month: int
+) -> int:
     row = conn.execute(
         "SELECT COUNT(*) as count FROM bets WHERE player_id = ? AND placed_year = ? AND placed_month = ?",
         (player_id, year, month),
     ).fetchone()
-    conn.close()
     return row["count"]
 
 
-def get_bets_used_in_january(player_id: int) -> int:
-    return get_bets_used_in_month(player_id, datetime.now().year, 1)
+@_writes
+def create_bet(
+    conn: sqlite3.Connection,
+    player_id: int,
+    platform: str,
+    market_id: str,
+    market_title: str,
+    position: str,
+    price_cents: int,
+) -> Bet:
+    bet = _insert_bet(
+        conn,
+        player_id,
+        platform,
+        market_id,
+        market_title,
+        position,
+        price_cents,
+        datetime.now(),
+    )
+    conn.commit()
+    _bump_data_version()
+    return bet
 
 
-def get_remaining_bets(player_id: int) -> int:
+@_writes
+def place_bet(
+    conn: sqlite3.Connection,
+    discord_id: str,
+    platform: str,
+    market_id: str,
+    market_title: str,
+    position: str,
+    price_cents: int,
+) -> BetPlacement:
+    """Check registration, monthly quota and duplicates, then insert, all in
+    one transaction so concurrent /bet calls can't overspend the quota."""
     now = datetime.now()
-    month = now.month
+    # Take the write lock before reading so the checks still hold at insert
+    conn.execute("BEGIN IMMEDIATE")
+    row = conn.execute(
+        """
+        SELECT
+            p.id,
+            (SELECT COUNT(*) FROM bets b
+             WHERE b.player_id = p.id AND b.placed_year = ? AND b.placed_month = ?) AS used,
+            EXISTS(SELECT 1 FROM bets b
+                   WHERE b.player_id = p.id AND b.market_id = ?) AS duplicate
+        FROM players p
+        WHERE p.discord_id = ? AND p.year = ?
+        """,
+        (now.year, now.month, market_id, discord_id, now.year),
+    ).fetchone()
 
-    if month == 1:
-        used = get_bets_used_in_january(player_id)
-        return max(0, 16 - used)
-    else:
-        used = get_bets_used_in_month(player_id, now.year, month)
-        return max(0, 1 - used)
+    if row is None:
+        conn.rollback()
+        return BetPlacement("not_registered")
+    remaining = max(0, monthly_allowance(now.month) - row["used"])
+    if remaining <= 0:
+        conn.rollback()
+        return BetPlacement("no_bets_remaining")
+    if row["duplicate"]:
+        conn.rollback()
+        return BetPlacement("duplicate", remaining=remaining)
+
+    bet = _insert_bet(
+        conn,
+        row["id"],
+        platform,
+        market_id,
+        market_title,
+        position,
+        price_cents,
+        now,
+    )
+    conn.commit()
+    _bump_data_version()
+    return BetPlacement("placed", bet=bet, remaining=remaining - 1)
 
 
-def create_bet(
+def _insert_bet(
+    conn: sqlite3.Connection,
     player_id: int,
     platform: str,
     market_id: str,
     market_title: str,
     position: str,
     price_cents: int,
+    now: datetime,
 ) -> Bet:
-    now = datetime.now()
     stake_cents = get_bet_stake(now.month)
 
-    conn = get_connection()
     cursor = conn.execute(
         """INSERT INTO bets
            (player_id, platform, market_id, market_title, position, price_cents, stake_cents, placed_year, placed_month)
@@ -144,12 +587,9 @@ def create_bet(
             now.month,
         ),
     )
-    bet_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
 
     return Bet(
-        id=bet_id,
+        id=cursor.lastrowid,
         player_id=player_id,
         platform=platform,
         market_id=market_id,
@@ -157,62 +597,274 @@ def create_bet(
         position=position,
         price_cents=price_cents,
         stake_cents=stake_cents,
-        placed_at=now,
+        placed_at_raw=now.isoformat(),
         placed_year=now.year,
         placed_month=now.month,
-        resolved_at=None,
+        resolved_at_raw=None,
         outcome=None,
         payout_cents=None,
     )
 
 
-def resolve_bet(bet_id: int, outcome: str, payout_cents: int):
-    conn = get_connection()
+@_writes
+def resolve_bet(conn: sqlite3.Connection, bet_id: int, outcome: str, payout_cents: int):
     conn.execute(
         "UPDATE bets SET outcome = ?, payout_cents = ?, resolved_at = ? WHERE id = ?",
         (outcome, payout_cents, datetime.now().isoformat(), bet_id),
     )
     conn.commit()
-    conn.close()
+    _bump_data_version()
 
 
-def get_all_unresolved_bets() -> list[Bet]:
-    conn = get_connection()
-    rows = conn.execute("SELECT * FROM bets WHERE outcome IS NULL").fetchall()
-    conn.close()
-    return [_row_to_bet(row) for row in rows]
+@_writes
+def resolve_bets(
+    conn: sqlite3.Connection, resolutions: list[tuple[int, str, int]]
+) -> int:
+    """Apply many (bet_id, outcome, payout_cents) resolutions in one transaction."""
+    resolved_at = datetime.now().isoformat()
+    cursor = conn.executemany(
+        "UPDATE bets SET outcome = ?, payout_cents = ?, resolved_at = ? WHERE id = ?",
+        [
+            (outcome, payout_cents, resolved_at, bet_id)
+            for bet_id, outcome, payout_cents in resolutions
+        ],
+    )
+    conn.commit()
+    _bump_data_version()
+    return cursor.rowcount
+
+
+# Settles every pending bet on a market from its final resolution. A "void"
+# market matches no position, so every bet on it is a $0 loss.
+_RESOLVE_MARKET_SQL = """
+    UPDATE bets SET
+        outcome = CASE WHEN position = :resolution THEN 'win' ELSE 'loss' END,
+        payout_cents = CASE
+            WHEN position = :resolution THEN stake_cents * 100 / price_cents
+            ELSE 0
+        END,
+        resolved_at = :resolved_at
+    WHERE platform = :platform AND market_id = :market_id AND outcome IS NULL
+"""
+
+
+# Records a market's final resolution so it's never fetched again
+_RECORD_RESOLUTION_SQL = """
+    INSERT INTO markets (platform, market_id, closed, resolution, resolved_at, updated_at)
+    VALUES (:platform, :market_id, 1, :resolution, :resolved_at, :resolved_at)
+    ON CONFLICT (platform, market_id) DO UPDATE SET
+        closed = 1,
+        resolution = excluded.resolution,
+        resolved_at = excluded.resolved_at,
+        updated_at = excluded.updated_at
+"""
+
+
+@_writes
+def resolve_market(
+    conn: sqlite3.Connection, platform: str, market_id: str, resolution: str
+) -> int:
+    """Resolve all pending bets on a market with one UPDATE. Returns bets resolved."""
+    return _resolve_markets(conn, [(platform, market_id, resolution)])
+
+
+@_writes
+def resolve_markets(
+    conn: sqlite3.Connection, resolutions: list[tuple[str, str, str]]
+) -> int:
+    """Resolve pending bets on many (platform, market_id, resolution) markets
+    in one transaction. Returns bets resolved."""
+    return _resolve_markets(conn, resolutions)
+
+
+def _resolve_markets(
+    conn: sqlite3.Connection, resolutions: list[tuple[str, str, str]]
+) -> int:
+    resolved_at = datetime.now().isoformat()
+    params = [
+        {
+            "platform": platform,
+            "market_id": market_id,
+            "resolution": resolution,
+            "resolved_at": resolved_at,
+        }
+        for platform, market_id, resolution in resolutions
+    ]
+    cursor = conn.executemany(_RESOLVE_MARKET_SQL, params)
+    resolved = cursor.rowcount
+    conn.executemany(_RECORD_RESOLUTION_SQL, params)
+    conn.commit()
+    if resolved:
+        _bump_data_version()
+    return resolved
+
+
+@_reads
+def get_market_resolutions(
+    conn: sqlite3.Connection, markets: list[tuple[str, str]]
+) -> dict[tuple[str, str], str]:
+    """Return the recorded final resolution of each (platform, market_id) known
+    to have settled. Markets not yet settled are left out."""
+    rows = conn.execute(
+        """
+        SELECT m.platform, m.market_id, m.resolution
+        FROM json_each(?) w
+        JOIN markets m
+          ON m.platform = json_extract(w.value, '$[0]')
+         AND m.market_id = json_extract(w.value, '$[1]')
+        WHERE m.resolution IS NOT NULL
+        """,
+        (json.dumps(markets),),
+    ).fetchall()
+    return {(row["platform"], row["market_id"]): row["resolution"] for row in rows}
+
+
+@_reads
+def count_unresolved_bets(conn: sqlite3.Connection) -> int:
+    return conn.execute("SELECT COUNT(*) FROM bets WHERE outcome IS NULL").fetchone()[0]
+
+
+@_reads
+def get_pending_markets(
+    conn: sqlite3.Connection,
+) -> list[tuple[str, str, Optional[datetime], bool]]:
+    """(platform, market_id, end_date, closed) for every market with a pending
+    bet. end_date is None and closed False for markets never recorded."""
+    rows = conn.execute(
+        """
+        SELECT b.platform, b.market_id, m.end_date, COALESCE(m.closed, 0) AS closed
+        FROM bets b
+        LEFT JOIN markets m ON m.platform = b.platform AND m.market_id = b.market_id
+        WHERE b.outcome IS NULL
+        GROUP BY b.platform, b.market_id
+        """
+    ).fetchall()
+    return [
+        (
+            row["platform"],
+            row["market_id"],
+            datetime.fromisoformat(row["end_date"]) if row["end_date"] else None,
+            bool(row["closed"]),
+        )
+        for row in rows
+    ]
+
+
+@_reads
+def get_market_by_slug(
+    conn: sqlite3.Connection, platform: str, slug: str
+) -> Optional[Market]:
+    row = conn.execute(
+        "SELECT * FROM markets WHERE platform = ? AND slug = ?", (platform, slug)
+    ).fetchone()
+    return _row_to_market(row) if row else None
+
+
+@_writes
+def save_market(conn: sqlite3.Connection, market: MarketInfo):
+    """Record a fetched market's metadata. A closed market stays closed."""
+    conn.execute(
+        """
+        INSERT INTO markets (platform, market_id, slug, title, outcomes, closed, updated_at, end_date)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (platform, market_id) DO UPDATE SET
+            slug = COALESCE(excluded.slug, markets.slug),
+            title = excluded.title,
+            outcomes = COALESCE(excluded.outcomes, markets.outcomes),
+            closed = MAX(markets.closed, excluded.closed),
+            updated_at = excluded.updated_at,
+            end_date = COALESCE(excluded.end_date, markets.end_date)
+        """,
+        (
+            market.platform,
+            market.market_id,
+            market.slug,
+            market.title,
+            json.dumps(market.outcomes) if market.outcomes else None,
+            int(market.resolved),
+            datetime.now().isoformat(),
+            market.end_date.isoformat() if market.end_date else None,
+        ),
+    )
+    conn.commit()
+
+
+@_reads
+def get_event(conn: sqlite3.Connection, platform: str, slug: str) -> Optional[dict]:
+    """Return {"market_slug": ...} for a known event; market_slug is None for
+    events rejected as multi-outcome. None if the event has never been seen."""
+    row = conn.execute(
+        "SELECT market_slug FROM events WHERE platform = ? AND slug = ?",
+        (platform, slug),
+    ).fetchone()
+    return {"market_slug": row["market_slug"]} if row else None
+
+
+@_writes
+def save_event(
+    conn: sqlite3.Connection, platform: str, slug: str, market_slug: Optional[str]
+):
+    conn.execute(
+        """
+        INSERT INTO events (platform, slug, market_slug) VALUES (?, ?, ?)
+        ON CONFLICT (platform, slug) DO UPDATE SET market_slug = excluded.market_slug
+        """,
+        (platform, slug, market_slug),
+    )
+    conn.commit()
+
 
+@_reads
+def get_all_unresolved_bets(conn: sqlite3.Connection) -> list[Bet]:
+    return [bet for batch in _iter_unresolved_bets(conn) for bet in batch]
 
-def get_leaderboard(year: int) -> list[dict]:
+
+@_streams
+def stream_unresolved_bets(
+    conn: sqlite3.Connection, batch_size: int = DB_FETCH_BATCH_SIZE
+) -> Iterator[list[Bet]]:
+    """Every pending bet, in batches of `batch_size`."""
+    return _iter_unresolved_bets(conn, batch_size)
+
+
+def _iter_unresolved_bets(
+    conn: sqlite3.Connection, batch_size: int = DB_FETCH_BATCH_SIZE
+) -> Iterator[list[Bet]]:
+    cursor = _tuples(
+        conn,
+        """
+        SELECT id, player_id, platform, market_id, market_title, position,
+               price_cents, stake_cents, placed_at, placed_year, placed_month,
+               resolved_at, outcome, payout_cents
+        FROM bets WHERE outcome IS NULL
+        """,
+    )
+    return _batches(cursor, Bet, batch_size)
+
+
+@_reads
+def get_leaderboard(conn: sqlite3.Connection, year: int) -> list[dict]:
     now = datetime.now()
     current_month = now.month
 
-    conn = get_connection()
     rows = conn.execute(
         """
         SELECT
-            p.id as player_id,
             p.discord_id,
-            COALESCE(SUM(CASE WHEN b.outcome = 'win' THEN b.payout_cents ELSE 0 END), 0) as total_cents,
-            COALESCE(MAX(CASE WHEN b.outcome = 'win' THEN b.payout_cents ELSE 0 END), 0) as biggest_win_cents,
-            COALESCE(SUM(CASE WHEN b.outcome IS NULL THEN b.stake_cents * 100 / b.price_cents ELSE 0 END), 0) as pending_potential_cents,
-            COUNT(CASE WHEN b.outcome IS NULL THEN 1 END) as pending_count,
-            COUNT(CASE WHEN b.placed_year = ? AND b.placed_month = ? THEN 1 END) as bets_this_month
-        FROM players p
-        LEFT JOIN bets b ON p.id = b.player_id
-        WHERE p.year = ?
-        GROUP BY p.id, p.discord_id
-        ORDER BY total_cents DESC, biggest_win_cents DESC
+            s.total_cents,
+            s.biggest_win_cents,
+            s.pending_potential_cents,
+            s.pending_count,
+            CASE WHEN s.month_key = ? THEN s.bets_this_month ELSE 0 END as bets_this_month
+        FROM player_standings s
+        JOIN players p ON p.id = s.player_id
+        WHERE s.year = ?
+        ORDER BY s.total_cents DESC, s.biggest_win_cents DESC
         """,
-        (year, current_month, year),
+        (year * 12 + current_month, year),
     ).fetchall()
-    conn.close()
 
-    # Calculate remaining bets based on current month
-    if current_month == 1:
-        max_bets = 16
-    else:
-        max_bets = 1
+    max_bets = monthly_allowance(current_month)
 
     return [
         {
@@ -227,22 +879,80 @@ def get_leaderboard(year: int) -> list[dict]:
     ]
 
 
-def _row_to_bet(row: sqlite3.Row) -> Bet:
-    return Bet(
-        id=row["id"],
-        player_id=row["player_id"],
+@_writes
+def rebuild_standings(conn: sqlite3.Connection) -> int:
+    """Recompute player_standings from scratch from bets. Returns players rebuilt."""
+    return _rebuild_standings(conn)
+
+
+def _rebuild_standings(conn: sqlite3.Connection) -> int:
+    conn.execute("DELETE FROM player_standings")
+    cursor = conn.execute(
+        """
+        INSERT INTO player_standings (
+            player_id, year, total_cents, biggest_win_cents,
+            pending_potential_cents, pending_count, month_key, bets_this_month
+        )
+        SELECT
+            p.id,
+            p.year,
+            COALESCE(SUM(CASE WHEN b.outcome = 'win' THEN b.payout_cents ELSE 0 END), 0),
+            COALESCE(MAX(CASE WHEN b.outcome = 'win' THEN b.payout_cents ELSE 0 END), 0),
+            COALESCE(SUM(CASE WHEN b.outcome IS NULL THEN b.stake_cents * 100 / b.price_cents ELSE 0 END), 0),
+            COUNT(CASE WHEN b.id IS NOT NULL AND b.outcome IS NULL THEN 1 END),
+            MAX(b.placed_year * 12 + b.placed_month),
+            0
+        FROM players p
+        LEFT JOIN bets b ON p.id = b.player_id
+        GROUP BY p.id
+        """
+    )
+    conn.execute(
+        """
+        UPDATE player_standings SET bets_this_month = (
+            SELECT COUNT(*) FROM bets b
+            WHERE b.player_id = player_standings.player_id
+              AND b.placed_year * 12 + b.placed_month = player_standings.month_key
+        )
+        WHERE month_key IS NOT NULL
+        """
+    )
+    conn.commit()
+    _bump_data_version()
+    return cursor.rowcount
+
+
+def _tuples(conn: sqlite3.Connection, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+    """Execute returning plain tuples, skipping per-row sqlite3.Row objects.
+
+    Used by the hot model queries, whose column lists match the model's field
+    order so each row decodes as Model(*row).
+    """
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    return cursor.execute(sql, params)
+
+
+def _batches(
+    cursor: sqlite3.Cursor, model: Callable[..., T], batch_size: int
+) -> Iterator[list[T]]:
+    """Decode a tuple cursor into lists of at most `batch_size` models."""
+    try:
+        while rows := cursor.fetchmany(batch_size):
+            yield list(starmap(model, rows))
+    finally:
+        cursor.close()
+
+
+def _row_to_market(row: sqlite3.Row) -> Market:
+    return Market(
         platform=row["platform"],
         market_id=row["market_id"],
-        market_title=row["market_title"],
-        position=row["position"],
-        price_cents=row["price_cents"],
-        stake_cents=row["stake_cents"],
-        placed_at=datetime.fromisoformat(row["placed_at"]),
-        placed_year=row["placed_year"],
-        placed_month=row["placed_month"],
-        resolved_at=datetime.fromisoformat(row["resolved_at"])
-        if row["resolved_at"]
-        else None,
-        outcome=row["outcome"],
-        payout_cents=row["payout_cents"],
+        slug=row["slug"],
+        title=row["title"],
+        outcomes=json.loads(row["outcomes"]) if row["outcomes"] else None,
+        closed=bool(row["closed"]),
+        resolution=row["resolution"],
+        resolved_at_raw=row["resolved_at"],
+        end_date_raw=row["end_date"],
     )
@@ -0,0 +1,177 @@
+import asyncio
+import functools
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from config import (
+    MARKET_CACHE_SIZE,
+    MARKET_METADATA_TTL_SECONDS,
+    MARKET_PRICE_TTL_SECONDS,
+)
+from models import MarketInfo
+
+_MISSING = object()
+
+
+@dataclass(slots=True, frozen=True)
+class MarketMetadata:
+    """The parts of a market that outlive its prices."""
+
+    market_id: str
+    title: str
+    outcomes: Optional[list[str]]
+
+
+class TTLCache:
+    """Size-capped LRU mapping whose entries expire `ttl` seconds after being set."""
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value = self.peek(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Like `get`, but without counting a hit or miss."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > self.clock():
+                self._entries.move_to_end(key)
+                return value
+            del self._entries[key]
+        return default
+
+    def set(self, key: Hashable, value: Any):
+        self._entries[key] = (self.clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+class MarketCache:
+    """In-process cache in front of the Gamma API.
+
+    Prices go stale quickly, so full `MarketInfo` snapshots (keyed by market
+    id) live for a short TTL. A market's id, title and outcomes (keyed by
+    slug) and event -> market slug mappings rarely change and are kept much
+    longer; once a slug is known, expired prices are refreshed by id.
+    Concurrent misses for the same key share one in-flight fetch instead of
+    each hitting the API.
+
+    Each lookup counts one hit or miss against the tier that answers it.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = MARKET_CACHE_SIZE,
+        price_ttl: float = MARKET_PRICE_TTL_SECONDS,
+        metadata_ttl: float = MARKET_METADATA_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.prices = TTLCache(maxsize, price_ttl, clock)
+        self.metadata = TTLCache(maxsize, metadata_ttl, clock)
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+
+    def get_by_id(self, market_id: str) -> Optional[MarketInfo]:
+        return self.prices.get(market_id)
+
+    def get_by_slug(self, market_slug: str) -> Optional[MarketInfo]:
+        metadata = self.metadata.peek(("slug", market_slug))
+        if metadata is None:
+            self.prices.misses += 1
+            return None
+        return self.prices.get(metadata.market_id)
+
+    def get_metadata(self, market_slug: str) -> Optional[MarketMetadata]:
+        """Return the id, title and outcomes of a market, even if its prices expired."""
+        return self.metadata.get(("slug", market_slug))
+
+    def put(self, market_slug: str, market: MarketInfo):
+        self.metadata.set(
+            ("slug", market_slug),
+            MarketMetadata(market.market_id, market.title, market.outcomes),
+        )
+        self.prices.set(market.market_id, market)
+
+    async def market(
+        self,
+        market_slug: str,
+        fetch: Callable[[str], Awaitable[Optional[MarketInfo]]],
+        refresh: Optional[Callable[[str], Awaitable[Optional[MarketInfo]]]] = None,
+    ) -> Optional[MarketInfo]:
+        """Return the market for `market_slug`, fetching it on a miss.
+
+        If the slug is already known, `refresh(market_id)` (when given) is
+        used instead of `fetch(market_slug)` to re-read expired prices.
+        """
+        cached = self.get_by_slug(market_slug)
+        if cached is not None:
+            return cached
+
+        metadata = self.metadata.peek(("slug", market_slug))
+        if metadata is not None and refresh is not None:
+            load = functools.partial(refresh, metadata.market_id)
+        else:
+            load = functools.partial(fetch, market_slug)
+        market = await self._single_flight(("market", market_slug), load)
+        if market is not None:
+            self.put(market_slug, market)
+        return market
+
+    async def event_market_slug(
+        self,
+        event_slug: str,
+        fetch: Callable[[str], Awaitable[Optional[str]]],
+    ) -> Optional[str]:
+        """Return the single market slug of an event, fetching it on a miss."""
+        key = ("event", event_slug)
+        cached = self.metadata.get(key)
+        if cached is not None:
+            return cached
+
+        market_slug = await self._single_flight(key, lambda: fetch(event_slug))
+        if market_slug is not None:
+            self.metadata.set(key, market_slug)
+        return market_slug
+
+    async def _single_flight(self, key: Hashable, fetch: Callable[[], Awaitable]):
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so one caller giving up doesn't cancel the fetch for the rest
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "price_hits": self.prices.hits,
+            "price_misses": self.prices.misses,
+            "metadata_hits": self.metadata.hits,
+            "metadata_misses": self.metadata.misses,
+            "size": len(self.prices) + len(self.metadata),
+        }
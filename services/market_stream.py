@@ -0,0 +1,161 @@
+import asyncio
+import json
+import logging
+from typing import Any, Optional
+
+import aiohttp
+
+from services import database, resolver
+from services.resilience import backoff_delay
+
+log = logging.getLogger(__name__)
+
+# Events that mean a market may have settled; everything else (price and
+# order book updates) is ignored
+SETTLEMENT_EVENTS = frozenset({"market_resolved", "market_closed"})
+
+
+class MarketStream:
+    """Websocket subscriber that resolves bets as soon as their market settles.
+
+    Subscribes to the ids of markets with pending bets, refreshing that set
+    every `refresh_interval` seconds. The client sends
+    ``{"type": "subscribe" | "unsubscribe", "markets": [ids]}``; the server
+    sends JSON events (one object or a list), each with an ``event_type`` and
+    the ``market`` id it concerns. A settlement event only triggers a check
+    through the Gamma API, so the API stays the source of truth and a
+    spurious event costs one request.
+
+    The connection is re-established with jittered backoff whenever it
+    drops; while it is up, `resolver.stream_connected` tells the polling
+    sweeps they can slow down.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        refresh_interval: float = 60.0,
+        platform: str = "polymarket",
+        backoff_base: float = 1.0,
+        backoff_cap: float = 60.0,
+    ):
+        self.url = url
+        self.refresh_interval = refresh_interval
+        self.platform = platform
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.subscribed: set[str] = set()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._task: Optional[asyncio.Task] = None
+        self._due: set[str] = set()
+        self._wake = asyncio.Event()
+        self._checker: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._session = aiohttp.ClientSession()
+        self._task = asyncio.create_task(self._run())
+        self._checker = asyncio.create_task(self._check_due())
+
+    async def close(self):
+        for task in (self._task, self._checker):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = self._checker = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        resolver.stream_connected = False
+
+    async def _run(self):
+        attempt = 0
+        while True:
+            try:
+                async with self._session.ws_connect(self.url, heartbeat=30) as ws:
+                    resolver.stream_connected = True
+                    attempt = 0
+                    self.subscribed = set()
+                    await self._listen(ws)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                log.warning("Market stream connection failed: %s", exc)
+            except Exception:
+                # Whatever went wrong, polling covers the gap until we're back
+                log.exception("Market stream failed; reconnecting")
+            finally:
+                resolver.stream_connected = False
+            await asyncio.sleep(
+                backoff_delay(attempt, self.backoff_base, self.backoff_cap)
+            )
+            attempt += 1
+
+    async def _listen(self, ws: aiohttp.ClientWebSocketResponse):
+        refresher = asyncio.create_task(self._refresh_subscriptions(ws))
+        try:
+            async for message in ws:
+                if message.type == aiohttp.WSMsgType.TEXT:
+                    self._handle(message.data)
+                elif message.type == aiohttp.WSMsgType.ERROR:
+                    break
+        finally:
+            # A send on a dropped connection fails the refresher; the
+            # reconnect below takes care of it
+            refresher.cancel()
+            refresher.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    async def _refresh_subscriptions(self, ws: aiohttp.ClientWebSocketResponse):
+        while True:
+            try:
+                pending = {
+                    market_id
+                    for platform, market_id, _, _ in await database.get_pending_markets()
+                    if platform == self.platform
+                }
+            except Exception:
+                # Keep the current subscriptions; polling covers the gap
+                log.exception("Couldn't refresh market stream subscriptions")
+            else:
+                added, removed = pending - self.subscribed, self.subscribed - pending
+                if added:
+                    await ws.send_json({"type": "subscribe", "markets": sorted(added)})
+                if removed:
+                    await ws.send_json(
+                        {"type": "unsubscribe", "markets": sorted(removed)}
+                    )
+                self.subscribed = pending
+            await asyncio.sleep(self.refresh_interval)
+
+    def _handle(self, data: str):
+        try:
+            events: Any = json.loads(data)
+        except ValueError:
+            log.warning("Ignoring undecodable market stream message")
+            return
+        for event in events if isinstance(events, list) else [events]:
+            if not isinstance(event, dict):
+                continue
+            market_id = str(event.get("market", ""))
+            if (
+                event.get("event_type") in SETTLEMENT_EVENTS
+                and market_id in self.subscribed
+            ):
+                self._due.add(market_id)
+                self._wake.set()
+
+    async def _check_due(self):
+        """Settle flagged markets, batching events that arrive together."""
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            market_ids, self._due = sorted(self._due), set()
+            try:
+                resolved = await resolver.settle_now(
+                    [(self.platform, market_id) for market_id in market_ids]
+                )
+            except Exception:
+                log.exception("Settling streamed markets %s failed", market_ids)
+                continue
+            if resolved:
+                log.info("Resolved %d bet(s) from market stream", resolved)
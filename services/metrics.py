@@ -0,0 +1,265 @@
+"""Opt-in Prometheus metrics.
+
+Instrumented code records into the module-level metrics below; nothing is
+recorded until `enable()` is called, so instrumentation costs one flag check
+when metrics are off. `MetricsServer` serves everything in the Prometheus
+text format at /metrics and samples event-loop lag while it runs.
+"""
+
+import asyncio
+import bisect
+import logging
+import threading
+from typing import Awaitable, Callable, Optional
+
+from aiohttp import web
+
+log = logging.getLogger(__name__)
+
+# Seconds; covers a cached SQLite read up to a Gamma request that timed out
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+_enabled = False
+_registry: list["_Metric"] = []
+_collectors: list[Callable[[], Awaitable[None]]] = []
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def register_collector(collect: Callable[[], Awaitable[None]]):
+    """Run `collect` before every scrape, to refresh gauges read from elsewhere."""
+    _collectors.append(collect)
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = {}
+        # Database queries record from their executor threads
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            samples = sorted(self._values.items())
+        for values, value in samples:
+            lines.append(f"{self.name}{_labels(self.labels, values)} {_number(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, *values: str, amount: float = 1):
+        if _enabled:
+            with self._lock:
+                self._values[values] = self._values.get(values, 0) + amount
+
+    def set_total(self, total: float, *values: str):
+        """Mirror a running total that is kept somewhere else."""
+        if _enabled:
+            self._values[values] = total
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def set(self, value: float, *values: str):
+        if _enabled:
+            self._values[values] = value
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labels)
+        self.buckets = buckets
+        # label values -> (per-bucket counts with a final +Inf slot, sum)
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *values: str):
+        if not _enabled:
+            return
+        with self._lock:
+            series = self._series.get(values)
+            if series is None:
+                series = ([0] * (len(self.buckets) + 1), [0.0])
+                self._series[values] = series
+            counts, total = series
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            total[0] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        bounds = [_number(bound) for bound in self.buckets] + ["+Inf"]
+        with self._lock:
+            series = sorted((v, (list(c), t[0])) for v, (c, t) in self._series.items())
+        for values, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                labels = _labels(self.labels + ("le",), values + (bound,))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _labels(self.labels, values)
+            lines.append(f"{self.name}_sum{labels} {_number(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = (f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + ",".join(pairs) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+async def render() -> str:
+    """Refresh collected gauges and return every metric in text format."""
+    for collect in _collectors:
+        try:
+            await collect()
+        except Exception:
+            log.exception("Metrics collector %s failed", collect.__qualname__)
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+COMMAND_SECONDS = Histogram(
+    "gambabot_command_duration_seconds",
+    "Time from a slash command arriving to its handler returning.",
+    ("command",),
+)
+COMMANDS = Counter(
+    "gambabot_commands_total",
+    "Slash commands handled, by outcome (ok or error).",
+    ("command", "status"),
+)
+QUERY_SECONDS = Histogram(
+    "gambabot_db_query_duration_seconds",
+    "Time a database query holds its connection (per batch for streams).",
+    ("query",),
+)
+QUERY_ERRORS = Counter(
+    "gambabot_db_query_errors_total",
+    "Database queries that raised.",
+    ("query",),
+)
+GAMMA_SECONDS = Histogram(
+    "gambabot_gamma_request_duration_seconds",
+    "Gamma API request latency per attempt, including retried attempts.",
+    ("endpoint",),
+)
+GAMMA_RESPONSES = Counter(
+    "gambabot_gamma_responses_total",
+    "Gamma API attempts by HTTP status, or timeout/error/breaker_open.",
+    ("endpoint", "status"),
+)
+CACHE_LOOKUPS = Counter(
+    "gambabot_market_cache_lookups_total",
+    "Market cache lookups by cache and result (hit or miss).",
+    ("cache", "result"),
+)
+CACHE_HIT_RATIO = Gauge(
+    "gambabot_market_cache_hit_ratio",
+    "Share of market cache lookups served from the cache since startup.",
+    ("cache",),
+)
+UNRESOLVED_BETS = Gauge(
+    "gambabot_unresolved_bets",
+    "Bets waiting for their market to resolve.",
+)
+SCHEDULED_MARKETS = Gauge(
+    "gambabot_scheduled_markets",
+    "Markets on the resolution schedule.",
+)
+LOOP_LAG_SECONDS = Histogram(
+    "gambabot_event_loop_lag_seconds",
+    "How late the event loop ran a timer it was asked to run on time.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+
+
+class MetricsServer:
+    """Serves /metrics over HTTP and samples event-loop lag in the background."""
+
+    def __init__(self, host: str, port: int, lag_interval: float = 0.5):
+        self.host = host
+        self.port = port
+        self.lag_interval = lag_interval
+        self._runner: Optional[web.AppRunner] = None
+        self._lag_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/metrics", self._metrics)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        # Resolve port 0 to the one actually bound
+        self.port = self._runner.addresses[0][1]
+        self._lag_task = asyncio.create_task(self._sample_lag())
+
+    async def close(self):
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+            self._lag_task = None
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _metrics(self, request: web.Request) -> web.Response:
+        return web.Response(
+            body=(await render()).encode(),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        )
+
+    async def _sample_lag(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.lag_interval
+            await asyncio.sleep(self.lag_interval)
+            LOOP_LAG_SECONDS.observe(max(0.0, loop.time() - expected))
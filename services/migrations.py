@@ -0,0 +1,164 @@
+"""Versioned schema migrations.
+
+Migrations live in migrations/ as NNN_name.sql or NNN_name.py and are applied
+in version order, each recorded in schema_migrations. A .sql migration runs in
+a single transaction. A .py migration defines `upgrade(conn)`, which also runs
+in a transaction unless the module sets `TRANSACTIONAL = False`; long data
+backfills do that and commit batch by batch through `backfill()`, so they must
+be safe to re-run if interrupted.
+
+A fresh database gets schema.sql (always the full current schema) and every
+migration is stamped as applied without running it.
+"""
+
+import importlib.util
+import re
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+ROOT = Path(__file__).parent.parent
+MIGRATIONS_DIR = ROOT / "migrations"
+SCHEMA_PATH = ROOT / "schema.sql"
+
+_FILENAME = re.compile(r"^(\d+)_(\w+)\.(sql|py)$")
+
+
+@dataclass
+class Migration:
+    version: int
+    name: str
+    path: Path
+
+    def __str__(self) -> str:
+        return self.path.name
+
+    def apply(self, conn: sqlite3.Connection):
+        record = (
+            "INSERT INTO schema_migrations (version, name) "
+            f"VALUES ({self.version}, '{self.name}')"
+        )
+        try:
+            if self.path.suffix == ".sql":
+                # executescript commits anything pending first, then runs the
+                # script verbatim, so the transaction has to be part of it
+                conn.executescript(
+                    f"BEGIN;\n{self.path.read_text()}\n;\n{record};\nCOMMIT;"
+                )
+                return
+
+            module = self._load()
+            if getattr(module, "TRANSACTIONAL", True):
+                conn.execute("BEGIN")
+            module.upgrade(conn)
+            conn.execute(record)
+            conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+
+    def _load(self):
+        spec = importlib.util.spec_from_file_location(
+            f"migrations.m{self.version:03d}", self.path
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+
+def discover(directory: Path = MIGRATIONS_DIR) -> list[Migration]:
+    migrations = []
+    for path in directory.iterdir():
+        match = _FILENAME.match(path.name)
+        if match:
+            migrations.append(Migration(int(match.group(1)), match.group(2), path))
+    migrations.sort(key=lambda m: m.version)
+
+    versions = [m.version for m in migrations]
+    if len(set(versions)) != len(versions):
+        raise ValueError(f"Duplicate migration versions in {directory}")
+    return migrations
+
+
+def migrate(
+    conn: sqlite3.Connection, migrations: list[Migration] | None = None
+) -> list[Migration]:
+    """Bring the database up to date. Returns the migrations that were run."""
+    if migrations is None:
+        migrations = discover()
+
+    fresh = not _table_exists(conn, "players")
+    tracked = _table_exists(conn, "schema_migrations")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    conn.commit()
+
+    if fresh:
+        conn.executescript(SCHEMA_PATH.read_text())
+        _stamp(conn, migrations)
+        return []
+    if not tracked:
+        _stamp_legacy(conn, migrations)
+
+    applied = {row[0] for row in conn.execute("SELECT version FROM schema_migrations")}
+    pending = [m for m in migrations if m.version not in applied]
+    for migration in pending:
+        migration.apply(conn)
+    return pending
+
+
+def backfill(
+    conn: sqlite3.Connection,
+    select_sql: str,
+    apply: Callable[[sqlite3.Connection, list], None],
+    batch_size: int = 1000,
+) -> int:
+    """Run a data backfill in keyset-paginated batches, committing each one.
+
+    `select_sql` takes (last_key, batch_size) parameters and must return rows
+    ordered by a unique key in the first column, e.g.
+    "SELECT id FROM players WHERE id > ? ORDER BY id LIMIT ?".
+    Returns the number of rows processed.
+    """
+    last_key = -1
+    total = 0
+    while True:
+        rows = conn.execute(select_sql, (last_key, batch_size)).fetchall()
+        if not rows:
+            return total
+        apply(conn, rows)
+        conn.commit()
+        total += len(rows)
+        last_key = rows[-1][0]
+
+
+def _table_exists(conn: sqlite3.Connection, name: str) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone()
+    return row is not None
+
+
+def _stamp(conn: sqlite3.Connection, migrations: list[Migration]):
+    conn.executemany(
+        "INSERT OR IGNORE INTO schema_migrations (version, name) VALUES (?, ?)",
+        [(m.version, m.name) for m in migrations],
+    )
+    conn.commit()
+
+
+def _stamp_legacy(conn: sqlite3.Connection, migrations: list[Migration]):
+    # Databases from before migrations were tracked were built from schema.sql,
+    # which already included stake_cents. Everything after 001 is idempotent.
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(bets)")}
+    if "stake_cents" in columns:
+        _stamp(conn, [m for m in migrations if m.version == 1])
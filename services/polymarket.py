@@ -1,14 +1,187 @@
+import asyncio
 import json
 import math
 import re
-from typing import Optional
+import time
+from datetime import datetime, timezone
+from typing import Any, Optional
 
 import aiohttp
 
+from config import (
+    POLYMARKET_BREAKER_RESET_SECONDS,
+    POLYMARKET_BREAKER_THRESHOLD,
+    POLYMARKET_BURST,
+    POLYMARKET_MAX_CONNECTIONS,
+    POLYMARKET_MAX_RETRIES,
+    POLYMARKET_RATE_PER_SECOND,
+    POLYMARKET_TIMEOUT_SECONDS,
+)
 from models import MarketInfo
+from services import metrics, profiler
+from services.resilience import CircuitBreaker, TokenBucket, backoff_delay
 
 GAMMA_API = "https://gamma-api.polymarket.com"
 
+# Throttling and server-side failures worth retrying
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRY_AFTER_SECONDS = 30.0
+
+
+class PolymarketUnavailable(Exception):
+    """The Gamma API couldn't be reached or kept failing; try again later."""
+
+
+class PolymarketClient:
+    """Long-lived Gamma API client.
+
+    Holds one aiohttp session so connections are kept alive and reused, DNS
+    lookups are cached and the number of open sockets stays bounded.
+
+    Requests pass through a token-bucket rate limiter. Timeouts, 429s and 5xx
+    responses are retried with jittered exponential backoff (honoring
+    Retry-After), and a circuit breaker fails fast while the API is down.
+    """
+
+    def __init__(
+        self,
+        base_url: str = GAMMA_API,
+        max_connections: int = POLYMARKET_MAX_CONNECTIONS,
+        timeout_seconds: float = POLYMARKET_TIMEOUT_SECONDS,
+        max_retries: int = POLYMARKET_MAX_RETRIES,
+        limiter: Optional[TokenBucket] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        backoff_base: float = 0.5,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.max_connections = max_connections
+        self.timeout = aiohttp.ClientTimeout(total=timeout_seconds)
+        self.max_retries = max_retries
+        self.limiter = limiter or TokenBucket(
+            POLYMARKET_RATE_PER_SECOND, POLYMARKET_BURST
+        )
+        self.breaker = breaker or CircuitBreaker(
+            POLYMARKET_BREAKER_THRESHOLD, POLYMARKET_BREAKER_RESET_SECONDS
+        )
+        self.backoff_base = backoff_base
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self):
+        if self._session is not None and not self._session.closed:
+            return
+
+        connector = aiohttp.TCPConnector(
+            limit=self.max_connections,
+            ttl_dns_cache=300,
+            keepalive_timeout=60,
+        )
+        self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def get_json(self, path: str, params: Any = None) -> tuple[int, Any]:
+        """GET a Gamma API path, returning (status, decoded JSON or None).
+
+        Raises PolymarketUnavailable if the API is down or keeps failing.
+        """
+        endpoint = _endpoint(path)
+        with profiler.span("gamma", endpoint):
+            return await self._get_json(path, endpoint, params)
+
+    async def _get_json(self, path: str, endpoint: str, params: Any) -> tuple[int, Any]:
+        admitted = self.breaker.allow()
+        if admitted is None:
+            metrics.GAMMA_RESPONSES.inc(endpoint, "breaker_open")
+            raise PolymarketUnavailable("Gamma API circuit breaker is open")
+
+        try:
+            await self.start()
+            return await self._get_with_retries(path, endpoint, params)
+        finally:
+            if admitted == "half-open":
+                self.breaker.release_trial()
+
+    async def _get_with_retries(
+        self, path: str, endpoint: str, params: Any
+    ) -> tuple[int, Any]:
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire()
+            retry_after = None
+            started = time.perf_counter()
+            status = "error"
+            try:
+                async with self._session.get(
+                    f"{self.base_url}{path}", params=params
+                ) as resp:
+                    status = str(resp.status)
+                    if resp.status in RETRY_STATUSES:
+                        retry_after = _parse_retry_after(resp.headers)
+                        error = PolymarketUnavailable(f"HTTP {resp.status} on {path}")
+                    elif resp.status != 200:
+                        self.breaker.record_success()
+                        return resp.status, None
+                    else:
+                        try:
+                            data = await resp.json(content_type=None)
+                        except ValueError:
+                            # A 200 with a truncated or garbled body
+                            status = "invalid_json"
+                            error = PolymarketUnavailable(f"Invalid JSON on {path}")
+                        else:
+                            self.breaker.record_success()
+                            return resp.status, data
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                if isinstance(exc, asyncio.TimeoutError):
+                    status = "timeout"
+                error = PolymarketUnavailable(f"{type(exc).__name__} on {path}")
+            finally:
+                metrics.GAMMA_SECONDS.observe(time.perf_counter() - started, endpoint)
+                metrics.GAMMA_RESPONSES.inc(endpoint, status)
+
+            if attempt < self.max_retries:
+                if retry_after is None:
+                    retry_after = backoff_delay(attempt, self.backoff_base)
+                await asyncio.sleep(retry_after)
+
+        self.breaker.record_failure()
+        raise error
+
+
+def _endpoint(path: str) -> str:
+    """The route a path was built from, so metrics aren't labelled per market."""
+    if path.startswith("/markets/"):
+        return "/markets/{id}"
+    if path.startswith("/events/slug/"):
+        return "/events/slug/{slug}"
+    return path
+
+
+def _parse_retry_after(headers) -> Optional[float]:
+    # Only the delay-seconds form; HTTP-date values fall back to backoff
+    try:
+        return min(float(headers["Retry-After"]), MAX_RETRY_AFTER_SECONDS)
+    except (KeyError, ValueError):
+        return None
+
+
+_client: Optional[PolymarketClient] = None
+
+
+def set_client(client: Optional[PolymarketClient]):
+    """Route module-level calls through `client` (owned by the bot)."""
+    global _client
+    _client = client
+
+
+def get_client() -> PolymarketClient:
+    global _client
+    if _client is None:
+        _client = PolymarketClient()
+    return _client
+
 
 def parse_polymarket_url(url: str) -> tuple[Optional[str], Optional[str]]:
     """Parse a Polymarket URL, returning (event_slug, market_slug).
@@ -35,57 +208,89 @@ def parse_polymarket_url(url: str) -> tuple[Optional[str], Optional[str]]:
     return (None, None)
 
 
-async def get_event_market_slug(event_slug: str) -> Optional[str]:
-    """Fetch event by slug, return market slug if it's a simple yes/no event."""
-    async with aiohttp.ClientSession() as session:
-        async with session.get(f"{GAMMA_API}/events/slug/{event_slug}") as resp:
-            if resp.status != 200:
-                return None
-            data = await resp.json()
+async def get_event(event_slug: str) -> Optional[dict]:
+    """Fetch an event by slug, or None if it couldn't be found."""
+    _, data = await get_client().get_json(f"/events/slug/{event_slug}")
+    return data or None
 
-    if not data:
-        return None
 
-    markets = data.get("markets", [])
+def event_market_slug(event: dict) -> Optional[str]:
+    """Return the market slug of a simple yes/no event, else None."""
+    markets = event.get("markets", [])
     if len(markets) != 1:
         # Multi-outcome event; user must specify which market
         return None
 
     market = markets[0]
-    outcomes = market.get("outcomes")
-    if outcomes:
-        if isinstance(outcomes, str):
-            outcomes = json.loads(outcomes)
-        # Only simple yes/no markets
-        if outcomes != ["Yes", "No"]:
-            return None
+    outcomes = _parse_outcomes(market)
+    # Only simple yes/no markets
+    if outcomes and outcomes != ["Yes", "No"]:
+        return None
 
     return market.get("slug")
 
 
+def event_market(event: dict) -> Optional[MarketInfo]:
+    """Parse the market embedded in a simple yes/no event, if it has prices.
+
+    Event responses carry full market objects, so this saves a separate
+    /markets?slug= request.
+    """
+    if event_market_slug(event) is None:
+        return None
+    return _parse_market_data(event["markets"][0])
+
+
 async def get_market_info(market_slug: str) -> Optional[MarketInfo]:
-    async with aiohttp.ClientSession() as session:
-        async with session.get(f"{GAMMA_API}/markets?slug={market_slug}") as resp:
-            if resp.status != 200:
-                return None
-            data = await resp.json()
+    _, data = await get_client().get_json("/markets", params={"slug": market_slug})
+    if not data or not isinstance(data, list) or len(data) == 0:
+        return None
 
-            if not data or not isinstance(data, list) or len(data) == 0:
-                return None
+    return _parse_market_data(data[0])
 
-            return _parse_market_data(data[0])
 
+async def get_market_by_id(market_id: str) -> Optional[MarketInfo]:
+    _, data = await get_client().get_json(f"/markets/{market_id}")
+    if not data or not isinstance(data, dict):
+        return None
+
+    return _parse_market_data(data)
 
-async def check_resolution(market_id: str) -> Optional[str]:
-    async with aiohttp.ClientSession() as session:
-        async with session.get(f"{GAMMA_API}/markets/{market_id}") as resp:
-            if resp.status != 200:
-                return None
-            data = await resp.json()
 
+async def check_resolution(market_id: str) -> Optional[str]:
+    _, data = await get_client().get_json(f"/markets/{market_id}")
     if not data:
         return None
 
+    return _parse_resolution(data)
+
+
+async def check_resolutions(market_ids: list[str]) -> dict[str, Optional[str]]:
+    """Check many markets with one list request, returning {market_id: resolution}.
+
+    Ids missing from the list response (e.g. filtered out upstream) fall back
+    to a single-market lookup so they're never silently skipped.
+    """
+    params = [("id", market_id) for market_id in market_ids]
+    params.append(("limit", str(len(market_ids))))
+    _, data = await get_client().get_json("/markets", params=params)
+
+    resolutions = {}
+    if isinstance(data, list):
+        for market in data:
+            market_id = str(market.get("id"))
+            if market_id in market_ids:
+                resolutions[market_id] = _parse_resolution(market)
+
+    missing = [market_id for market_id in market_ids if market_id not in resolutions]
+    if missing:
+        fallbacks = await asyncio.gather(*(check_resolution(m) for m in missing))
+        resolutions.update(zip(missing, fallbacks))
+
+    return resolutions
+
+
+def _parse_resolution(data: dict) -> Optional[str]:
     resolution_status = data.get("umaResolutionStatus")
     if resolution_status != "resolved":
         return None
@@ -111,6 +316,28 @@ async def check_resolution(market_id: str) -> Optional[str]:
         return "void"
 
 
+def _parse_outcomes(market: dict) -> Optional[list[str]]:
+    outcomes = market.get("outcomes")
+    if isinstance(outcomes, str):
+        try:
+            outcomes = json.loads(outcomes)
+        except ValueError:
+            return None
+    return outcomes or None
+
+
+def _parse_end_date(market: dict) -> Optional[datetime]:
+    end_date = market.get("endDate")
+    if not end_date:
+        return None
+    try:
+        parsed = datetime.fromisoformat(end_date)
+    except (ValueError, TypeError):
+        return None
+    # Gamma dates are UTC; a bare date or naive time is taken as UTC too
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
 def _parse_market_data(market: dict) -> Optional[MarketInfo]:
     market_id = market.get("id")
     if not market_id:
@@ -156,4 +383,7 @@ def _parse_market_data(market: dict) -> Optional[MarketInfo]:
         no_cents=no_cents,
         resolved=closed,
         resolution=resolution,
+        slug=market.get("slug"),
+        outcomes=_parse_outcomes(market),
+        end_date=_parse_end_date(market),
     )
@@ -0,0 +1,195 @@
+"""Opt-in profiling of slow slash commands.
+
+Command callbacks are wrapped with `profiled`. While profiling is enabled,
+each interaction collects a breakdown of the time spent waiting on SQLite
+and on the Gamma API (recorded by `span` in those layers); whatever is left
+is our own code, such as building embeds. Interactions slower than the
+threshold are written as one JSON line each to a rotating log, together with
+a cProfile report if the interaction was sampled for one.
+"""
+
+import cProfile
+import contextvars
+import functools
+import io
+import json
+import logging
+import logging.handlers
+import pstats
+import random
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Iterator, Optional, ParamSpec
+
+import discord
+
+P = ParamSpec("P")
+
+# How many functions of a cProfile report to keep, by cumulative time
+PROFILE_TOP_FUNCTIONS = 25
+
+log = logging.getLogger("gambabot.slow_interactions")
+log.propagate = False
+
+_handler: Optional[logging.Handler] = None
+_threshold: Optional[float] = None
+_sample_rate = 0.0
+# cProfile can only profile one interaction at a time per thread
+_cprofile_busy = False
+
+
+@dataclass(slots=True)
+class Breakdown:
+    """Time one interaction spent in each instrumented span."""
+
+    # "kind:name" -> [calls, seconds]
+    spans: dict[str, list] = field(default_factory=dict)
+
+    def add(self, key: str, seconds: float):
+        span = self.spans.setdefault(key, [0, 0.0])
+        span[0] += 1
+        span[1] += seconds
+
+
+_current: contextvars.ContextVar[Optional[Breakdown]] = contextvars.ContextVar(
+    "profiler_breakdown", default=None
+)
+
+
+def enable(
+    threshold: float,
+    path: str,
+    max_bytes: int,
+    backups: int,
+    sample_rate: float = 0.0,
+):
+    """Log interactions slower than `threshold` seconds to a rotating file.
+
+    A `sample_rate` share of interactions additionally run under cProfile.
+    """
+    global _handler, _threshold, _sample_rate
+    disable()
+    _handler = logging.handlers.RotatingFileHandler(
+        path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8"
+    )
+    _handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    log.addHandler(_handler)
+    log.setLevel(logging.INFO)
+    _threshold = threshold
+    _sample_rate = sample_rate
+
+
+def disable():
+    global _handler, _threshold, _sample_rate
+    _threshold = None
+    _sample_rate = 0.0
+    if _handler is not None:
+        log.removeHandler(_handler)
+        _handler.close()
+        _handler = None
+
+
+@contextmanager
+def span(kind: str, name: str) -> Iterator[None]:
+    """Attribute the time spent in this block to the current interaction.
+
+    Spans of concurrent tasks started by the interaction overlap, so their
+    total can exceed the interaction's wall time.
+    """
+    breakdown = _current.get()
+    if breakdown is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        breakdown.add(f"{kind}:{name}", time.perf_counter() - start)
+
+
+def profiled(
+    func: Callable[P, Awaitable[None]],
+) -> Callable[P, Awaitable[None]]:
+    """Wrap a command callback `func(interaction, **arguments)` for profiling."""
+
+    @functools.wraps(func)
+    async def wrapper(interaction: discord.Interaction, *args, **kwargs):
+        if _threshold is None:
+            return await func(interaction, *args, **kwargs)
+
+        breakdown = Breakdown()
+        token = _current.set(breakdown)
+        profile = _start_cprofile()
+        start = time.perf_counter()
+        try:
+            return await func(interaction, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current.reset(token)
+            report = _stop_cprofile(profile)
+            if elapsed >= _threshold:
+                _log_slow(interaction, func, kwargs, elapsed, breakdown, report)
+
+    return wrapper
+
+
+def _start_cprofile() -> Optional[cProfile.Profile]:
+    global _cprofile_busy
+    if _cprofile_busy or not _sample_rate or random.random() >= _sample_rate:
+        return None
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        # Another profiler (e.g. a debugger) already owns the thread
+        return None
+    _cprofile_busy = True
+    return profile
+
+
+def _stop_cprofile(profile: Optional[cProfile.Profile]) -> Optional[str]:
+    """Stop a sampled profile and return its report.
+
+    The profile covers everything the event loop ran meanwhile, including
+    other interactions.
+    """
+    global _cprofile_busy
+    if profile is None:
+        return None
+    profile.disable()
+    _cprofile_busy = False
+    out = io.StringIO()
+    stats = pstats.Stats(profile, stream=out)
+    stats.sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+    return out.getvalue()
+
+
+def _log_slow(
+    interaction: discord.Interaction,
+    func: Callable,
+    arguments: dict,
+    elapsed: float,
+    breakdown: Breakdown,
+    report: Optional[str],
+):
+    command = getattr(interaction, "command", None)
+    spans = {
+        key: {"calls": calls, "ms": round(seconds * 1000, 1)}
+        for key, (calls, seconds) in sorted(
+            breakdown.spans.items(), key=lambda item: -item[1][1]
+        )
+    }
+    waited = sum(seconds for _, seconds in breakdown.spans.values())
+    record = {
+        "command": command.qualified_name if command else func.__name__,
+        "arguments": {name: repr(value)[:200] for name, value in arguments.items()},
+        "user_id": interaction.user.id,
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "spans": spans,
+        "unaccounted_ms": round(max(0.0, elapsed - waited) * 1000, 1),
+    }
+    message = json.dumps(record, ensure_ascii=False)
+    if report:
+        message += "\n" + report
+    log.info(message)
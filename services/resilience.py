@@ -0,0 +1,102 @@
+import asyncio
+import random
+import time
+from typing import Callable, Optional
+
+
+class TokenBucket:
+    """Client-side rate limiter: `rate` requests/second with bursts up to `capacity`."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        elapsed = now - self._updated
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    async def acquire(self):
+        while not self.try_acquire():
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class CircuitBreaker:
+    """Fails fast after `failure_threshold` consecutive failures.
+
+    While open, calls are rejected without touching the upstream. After
+    `reset_timeout` seconds one trial call is let through (half-open); its
+    success closes the breaker, its failure re-opens it. `allow` returns the
+    state a call was admitted in; the caller that got "half-open" must
+    `release_trial` once its call is over, so a trial that ends without a
+    verdict (e.g. cancelled) doesn't hold the breaker half-open forever.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self.clock() - self._opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> Optional[str]:
+        """Admit a call: returns "closed", "half-open" (this call is the
+        trial), or None if the call must fail fast."""
+        state = self.state
+        if state == "closed":
+            return state
+        if state == "half-open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return state
+        return None
+
+    def record_success(self):
+        self.failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    def release_trial(self):
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self._opened_at is not None or self.failures >= self.failure_threshold:
+            self._opened_at = self.clock()
+
+
+def backoff_delay(
+    attempt: int, base: float = 0.5, cap: float = 10.0, rng=random.random
+) -> float:
+    """Exponential backoff with full jitter for retry number `attempt` (0-based)."""
+    return rng() * min(cap, base * 2**attempt)
@@ -1,69 +1,257 @@
-from typing import Optional
+import asyncio
+import time
+from collections import defaultdict
+from typing import AsyncIterable, Iterable, Optional
 
+from config import RESOLVE_CHUNK_SIZE, RESOLVE_CONCURRENCY
 from models import Bet, MarketInfo
-from services import database, polymarket
+from services import database, metrics, polymarket
+from services.market_cache import MarketCache
+from services.scheduler import ResolutionScheduler
+
+market_cache = MarketCache()
+scheduler = ResolutionScheduler()
 
 
 async def get_market_info(url: str) -> Optional[MarketInfo]:
     event_slug, market_slug = polymarket.parse_polymarket_url(url)
 
-    if market_slug:
-        return await polymarket.get_market_info(market_slug)
-
-    if event_slug:
+    if not market_slug and event_slug:
         # Event-only URL; try to resolve to single yes/no market
-        resolved_slug = await polymarket.get_event_market_slug(event_slug)
-        if resolved_slug:
-            return await polymarket.get_market_info(resolved_slug)
+        market_slug = await market_cache.event_market_slug(
+            event_slug, _fetch_event_market_slug
+        )
+
+    if not market_slug:
+        return None
+
+    # Closed markets never reopen: answer from the DB without a network call
+    known = await database.get_market_by_slug("polymarket", market_slug)
+    if known and known.closed:
+        return MarketInfo(
+            platform=known.platform,
+            market_id=known.market_id,
+            title=known.title or market_slug,
+            yes_cents=0,
+            no_cents=0,
+            resolved=True,
+            resolution=known.resolution,
+            slug=known.slug,
+            outcomes=known.outcomes,
+        )
+
+    return await market_cache.market(market_slug, _fetch_market, _refresh_market)
+
+
+async def _fetch_event_market_slug(event_slug: str) -> Optional[str]:
+    known = await database.get_event("polymarket", event_slug)
+    if known is not None:
+        return known["market_slug"]
+
+    event = await polymarket.get_event(event_slug)
+    if event is None:
+        return None
+
+    market_slug = polymarket.event_market_slug(event)
+    await database.save_event("polymarket", event_slug, market_slug)
+
+    market = polymarket.event_market(event)
+    if market is not None:
+        await database.save_market(market)
+        market_cache.put(market_slug, market)
+    return market_slug
+
+
+async def _fetch_market(market_slug: str) -> Optional[MarketInfo]:
+    market = await polymarket.get_market_info(market_slug)
+    if market is not None:
+        await database.save_market(market)
+    return market
+
+
+async def _refresh_market(market_id: str) -> Optional[MarketInfo]:
+    market = await polymarket.get_market_by_id(market_id)
+    if market is not None:
+        # The market may have closed since its prices were cached
+        await database.save_market(market)
+    return market
+
+
+async def check_markets(
+    platform: str, market_ids: list[str]
+) -> dict[str, Optional[str]]:
+    """Returns {market_id: resolution or None} for a batch of markets."""
+    if platform == "polymarket":
+        return await polymarket.check_resolutions(market_ids)
+    return {}
+
 
-    return None
+async def resolve_bets(
+    bets: Iterable[Bet],
+    concurrency: int = RESOLVE_CONCURRENCY,
+    chunk_size: int = RESOLVE_CHUNK_SIZE,
+) -> int:
+    """Resolve bets, checking each distinct market once.
 
+    Pending markets are looked up `chunk_size` at a time in bulk requests, at
+    most `concurrency` requests in flight, and the single outcome is applied
+    to every pending bet placed on that market. Returns the number of bets
+    resolved.
+    """
+    markets = list(
+        dict.fromkeys(
+            (bet.platform, bet.market_id) for bet in bets if bet.outcome is None
+        )
+    )
+    resolved, _ = await settle_markets(markets, concurrency, chunk_size)
+    return resolved
 
-async def resolve_bet(bet: Bet) -> bool:
-    if bet.outcome is not None:
-        return False
 
-    if bet.platform == "polymarket":
-        resolution = await polymarket.check_resolution(bet.market_id)
-    else:
-        return False
+async def settle_markets(
+    markets: list[tuple[str, str]],
+    concurrency: int = RESOLVE_CONCURRENCY,
+    chunk_size: int = RESOLVE_CHUNK_SIZE,
+) -> tuple[int, set[tuple[str, str]]]:
+    """Look up (platform, market_id) pairs and settle every pending bet on
+    those that have resolved. Returns (bets resolved, markets settled)."""
+    if not markets:
+        return 0, set()
 
-    if resolution is None:
-        return False
+    # Settlements already on record need no network call
+    known = await database.get_market_resolutions(markets)
 
-    if resolution == "void":
-        database.resolve_bet(bet.id, "loss", 0)
-        return True
+    by_platform: dict[str, list[str]] = defaultdict(list)
+    for platform, market_id in markets:
+        if (platform, market_id) not in known:
+            by_platform[platform].append(market_id)
 
-    user_won = bet.position == resolution
+    chunks = [
+        (platform, market_ids[i : i + chunk_size])
+        for platform, market_ids in by_platform.items()
+        for i in range(0, len(market_ids), chunk_size)
+    ]
 
-    if user_won:
-        payout_cents = (bet.stake_cents * 100) // bet.price_cents
-        database.resolve_bet(bet.id, "win", payout_cents)
-    else:
-        database.resolve_bet(bet.id, "loss", 0)
+    semaphore = asyncio.Semaphore(concurrency)
 
-    return True
+    async def check(platform: str, market_ids: list[str]) -> dict:
+        async with semaphore:
+            try:
+                return await check_markets(platform, market_ids)
+            except polymarket.PolymarketUnavailable:
+                # Leave them pending; the next sweep will try again
+                return {}
 
+    results = await asyncio.gather(*(check(*chunk) for chunk in chunks))
 
-async def resolve_player_bets(player_id: int) -> int:
-    bets = database.get_bets_for_player(player_id)
-    resolved_count = 0
+    settled = [
+        (platform, market_id, resolution)
+        for (platform, market_id), resolution in known.items()
+    ] + [
+        (platform, market_id, resolution)
+        for (platform, _), result in zip(chunks, results)
+        for market_id, resolution in result.items()
+        if resolution is not None
+    ]
+    if not settled:
+        return 0, set()
 
-    for bet in bets:
-        if bet.outcome is None:
-            if await resolve_bet(bet):
-                resolved_count += 1
+    # One transaction (and one fsync) for the whole sweep
+    resolved = await database.resolve_markets(settled)
+    return resolved, {(platform, market_id) for platform, market_id, _ in settled}
 
-    return resolved_count
+
+async def resolve_bet_stream(
+    batches: AsyncIterable[list[Bet]],
+    concurrency: int = RESOLVE_CONCURRENCY,
+    chunk_size: int = RESOLVE_CHUNK_SIZE,
+) -> int:
+    """Resolve bets as they stream in, one batch at a time.
+
+    Memory stays bounded by the batch size plus the set of markets already
+    handled. That set also skips bets whose market an earlier batch settled:
+    the stream reads a snapshot taken before those writes, so they still show
+    up as pending.
+    """
+    seen: set[tuple[str, str]] = set()
+    resolved = 0
+    async for batch in batches:
+        fresh = [bet for bet in batch if (bet.platform, bet.market_id) not in seen]
+        seen.update((bet.platform, bet.market_id) for bet in fresh)
+        resolved += await resolve_bets(fresh, concurrency, chunk_size)
+    return resolved
 
 
 async def resolve_all_bets() -> int:
-    unresolved = database.get_all_unresolved_bets()
-    resolved_count = 0
+    """Check every market with a pending bet, regardless of schedule."""
+    return await resolve_bet_stream(database.stream_unresolved_bets())
+
+
+async def resolve_due_markets() -> int:
+    """Check only the pending markets the scheduler says are due."""
+    scheduler.sync(await database.get_pending_markets())
+    resolved, settled = await settle_markets(scheduler.take_due())
+    for key in settled:
+        scheduler.forget(key)
+    return resolved
+
+
+async def settle_now(markets: list[tuple[str, str]]) -> int:
+    """Check these markets straight away, outside the schedule (e.g. when a
+    market stream reports them settled). Returns the number of bets resolved."""
+    resolved, settled = await settle_markets(markets)
+    for key in settled:
+        scheduler.forget(key)
+    return resolved
+
+
+_sweep_running = False
+_last_sweep_at: Optional[float] = None
+# Set by MarketStream while its connection is up: settlements are pushed as
+# they happen, so polling sweeps are only a fallback
+stream_connected = False
+
+
+async def sweep() -> int:
+    """Resolve bets on due markets, unless a sweep is already in progress."""
+    global _sweep_running, _last_sweep_at
+    if _sweep_running:
+        return 0
+
+    _sweep_running = True
+    try:
+        return await resolve_due_markets()
+    finally:
+        _sweep_running = False
+        _last_sweep_at = time.monotonic()
+
+
+async def refresh_if_stale(max_age_seconds: float) -> int:
+    """Sweep only if the last sweep finished more than `max_age_seconds` ago.
+
+    Never waits behind a sweep that is already running, so callers on the
+    interaction path pay nothing while the background task is keeping up.
+    """
+    if _sweep_running:
+        return 0
+    if (
+        _last_sweep_at is not None
+        and time.monotonic() - _last_sweep_at < max_age_seconds
+    ):
+        return 0
+    return await sweep()
+
+
+async def collect_metrics():
+    """Refresh the backlog and cache gauges before a /metrics scrape."""
+    metrics.UNRESOLVED_BETS.set(await database.count_unresolved_bets())
+    metrics.SCHEDULED_MARKETS.set(len(scheduler))
+    stats = market_cache.stats()
+    for cache in ("price", "metadata"):
+        hits, misses = stats[f"{cache}_hits"], stats[f"{cache}_misses"]
+        metrics.CACHE_LOOKUPS.set_total(hits, cache, "hit")
+        metrics.CACHE_LOOKUPS.set_total(misses, cache, "miss")
+        if hits + misses:
+            metrics.CACHE_HIT_RATIO.set(hits / (hits + misses), cache)
 
-    for bet in unresolved:
-        if await resolve_bet(bet):
-            resolved_count += 1
 
-    return resolved_count
+metrics.register_collector(collect_metrics)
@@ -0,0 +1,132 @@
+import heapq
+import itertools
+import math
+import time
+from datetime import datetime
+from typing import Callable, Iterable, Optional
+
+from config import (
+    RESOLVE_INTERVAL_SECONDS,
+    RESOLVE_MAX_BACKOFF_SECONDS,
+    RESOLVE_NEAR_END_SECONDS,
+)
+
+MarketKey = tuple[str, str]
+
+
+class ResolutionScheduler:
+    """Decides when each pending market is next checked for a resolution.
+
+    Markets that are closed, have no known end date, or are within
+    `near_end` seconds of their end date (or past it) are due on every sweep.
+    Markets ending later back off exponentially from `interval` up to
+    `max_backoff`, but never past the point where they come within `near_end`
+    of their end. Due times live in a heap; entries superseded by a later
+    reschedule are skipped when popped.
+
+    Delays are floored at zero, so a market that is always due is checked
+    once per sweep: the sweep interval bounds the polling rate.
+    """
+
+    def __init__(
+        self,
+        interval: float = RESOLVE_INTERVAL_SECONDS,
+        near_end: float = RESOLVE_NEAR_END_SECONDS,
+        max_backoff: float = RESOLVE_MAX_BACKOFF_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.interval = interval
+        self.near_end = near_end
+        self.max_backoff = max_backoff
+        self.clock = clock
+        # Checks beyond this many already back off by `max_backoff`; capping
+        # the exponent keeps 2**checks from overflowing on markets that end
+        # far in the future
+        self._max_exponent = (
+            math.ceil(math.log2(max_backoff / interval))
+            if max_backoff > interval > 0
+            else 0
+        )
+        self._heap: list[tuple[float, int, MarketKey]] = []
+        self._counter = itertools.count()
+        # key -> (due_at, checks so far, end timestamp or None, closed)
+        self._markets: dict[MarketKey, tuple[float, int, Optional[float], bool]] = {}
+
+    def __len__(self) -> int:
+        return len(self._markets)
+
+    def sync(self, pending: Iterable[tuple[str, str, Optional[datetime], bool]]):
+        """Match the schedule to the current set of markets with pending bets.
+
+        New markets are scheduled, markets no longer pending are dropped, and
+        a newly learned end date or closure takes effect immediately.
+        """
+        now = self.clock()
+        current = set()
+        for platform, market_id, end_date, closed in pending:
+            key = (platform, market_id)
+            current.add(key)
+            end_at = end_date.timestamp() if end_date else None
+
+            known = self._markets.get(key)
+            if known is not None and known[2:] == (end_at, closed):
+                continue
+            checks = known[1] if known else 0
+            due_at = now + self._delay(now, checks, end_at, closed)
+            if known is not None:
+                due_at = min(due_at, known[0])
+            self._push(key, due_at, checks, end_at, closed)
+
+        for key in self._markets.keys() - current:
+            del self._markets[key]
+
+    def take_due(self) -> list[MarketKey]:
+        """Return every market due for a check now.
+
+        Each one is rescheduled straight away as if its check finds it still
+        unsettled, so a failed check can never drop a market from the
+        schedule. Call `forget` for those that did settle.
+        """
+        now = self.clock()
+        due: dict[MarketKey, None] = {}
+        while self._heap and self._heap[0][0] <= now:
+            due_at, _, key = heapq.heappop(self._heap)
+            entry = self._markets.get(key)
+            if entry is not None and entry[0] == due_at:
+                due[key] = None
+
+        for key in due:
+            _, checks, end_at, closed = self._markets[key]
+            checks += 1
+            due_at = now + self._delay(now, checks, end_at, closed)
+            self._push(key, due_at, checks, end_at, closed)
+        return list(due)
+
+    def forget(self, key: MarketKey):
+        self._markets.pop(key, None)
+
+    def next_due(self, key: MarketKey) -> Optional[float]:
+        entry = self._markets.get(key)
+        return entry[0] if entry else None
+
+    def _delay(
+        self, now: float, checks: int, end_at: Optional[float], closed: bool
+    ) -> float:
+        if closed or end_at is None:
+            return 0.0
+        until_near = end_at - self.near_end - now
+        if until_near <= 0:
+            return 0.0
+        backoff = self.interval * 2 ** min(checks, self._max_exponent)
+        return min(backoff, self.max_backoff, until_near)
+
+    def _push(
+        self,
+        key: MarketKey,
+        due_at: float,
+        checks: int,
+        end_at: Optional[float],
+        closed: bool,
+    ):
+        self._markets[key] = (due_at, checks, end_at, closed)
+        heapq.heappush(self._heap, (due_at, next(self._counter), key))
@@ -0,0 +1,14 @@
+import pytest
+
+# Shared with the load harness; tests import it from here
+from benchmarks.fakes import FakeInteraction  # noqa: F401
+from services import database
+
+
+@pytest.fixture
+def db(monkeypatch, tmp_path):
+    """Point the database layer at a fresh temporary SQLite file."""
+    monkeypatch.setattr(database, "DATABASE_PATH", str(tmp_path / "test.db"))
+    database.init_db()
+    yield database
+    database.close_db()
@@ -0,0 +1,63 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from commands import bets
+from tests.conftest import FakeInteraction
+
+
+@pytest.fixture
+def history(db):
+    """Player 1 with 25 bets (placed in the same second), every third won."""
+
+    async def seed():
+        player = await db.register_player("1", datetime.now().year)
+        for i in range(25):
+            bet = await db.create_bet(
+                player.id, "polymarket", f"m{i}", f"Market {i}", "yes", 50
+            )
+            if i % 3 == 0:
+                await db.resolve_bet(bet.id, "win", 200)
+        return player
+
+    return asyncio.run(seed())
+
+
+def titles(embed) -> list[str]:
+    return [line.rsplit(" - ", 1)[1] for line in embed.description.splitlines()]
+
+
+class TestBetsPagination:
+    """Test the paginated /bets view."""
+
+    def test_pages_walk_history(self, db, history):
+        async def run():
+            interaction = FakeInteraction()
+            await bets.bets(interaction)
+            view = interaction.sent[0]["view"]
+            pages = [interaction.sent[0]["embed"]]
+
+            for button in (view.older, view.older, view.newer):
+                await button.callback(interaction)
+                pages.append(interaction.sent[-1]["embed"])
+            return view, pages
+
+        view, pages = asyncio.run(run())
+
+        assert titles(pages[0]) == [f"Market {i}" for i in range(24, 14, -1)]
+        assert titles(pages[2]) == [f"Market {i}" for i in range(4, -1, -1)]
+        assert titles(pages[3]) == titles(pages[1])
+        assert pages[2].footer.text == "Page 3 of 3"
+        assert not view.newer.disabled and not view.older.disabled
+
+    def test_summary_aggregated_in_sql(self, db, history):
+        summary = asyncio.run(db.get_bet_summary(history.id))
+
+        assert summary["bet_count"] == 25
+        assert summary["win_count"] == 9
+        assert summary["pending_count"] == 16
+        assert summary["total_cents"] == 9 * 200
+        assert summary["biggest_win_cents"] == 200
+        stake = db.get_bet_stake(datetime.now().month)
+        assert summary["max_return_cents"] == 9 * 200 + 16 * stake * 2
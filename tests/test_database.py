@@ -0,0 +1,271 @@
+import asyncio
+import dataclasses
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+
+class TestAsyncDatabase:
+    """Test the awaitable data-access layer."""
+
+    def test_queries_run_off_the_event_loop(self, db):
+        """Blocking sqlite calls never execute on the event loop thread."""
+
+        @db._reads
+        def query_thread(conn):
+            return threading.current_thread()
+
+        async def run():
+            return threading.current_thread(), await query_thread()
+
+        loop_thread, db_thread = asyncio.run(run())
+        assert db_thread is not loop_thread
+
+    def test_bet_lifecycle(self, db):
+        """Register, bet, resolve and rank through the async API."""
+        year = datetime.now().year
+
+        async def run():
+            player = await db.register_player("42", year)
+            bet = await db.create_bet(player.id, "polymarket", "m1", "M1", "yes", 25)
+            assert await db.has_bet_on_market(player.id, "m1")
+            assert [b.id for b in await db.get_all_unresolved_bets()] == [bet.id]
+
+            await db.resolve_bet(bet.id, "win", 400)
+            assert await db.get_all_unresolved_bets() == []
+            return await db.get_leaderboard(year)
+
+        rankings = asyncio.run(run())
+        assert rankings[0]["discord_id"] == "42"
+        assert rankings[0]["total_cents"] == 400
+
+    def test_bets_decode_from_tuples(self, db):
+        year = datetime.now().year
+
+        async def run():
+            player = await db.register_player("42", year)
+            await db.create_bet(player.id, "polymarket", "m1", "M1", "yes", 25)
+            return await db.get_bets_for_player(player.id)
+
+        (bet,) = asyncio.run(run())
+        assert (bet.market_id, bet.position, bet.price_cents) == ("m1", "yes", 25)
+        assert isinstance(bet.placed_at_raw, str)
+        assert bet.placed_at.year == year
+        assert bet.resolved_at is None
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            bet.outcome = "win"
+
+    def test_bets_stream_in_batches(self, db):
+        async def run():
+            player = await db.register_player("42", 2025)
+            for i in range(5):
+                await db.create_bet(player.id, "polymarket", f"m{i}", "M", "yes", 25)
+
+            sizes = [len(b) async for b in db.stream_unresolved_bets(batch_size=2)]
+            async for _ in db.stream_bets_for_player(player.id, batch_size=2):
+                break
+            return sizes
+
+        assert asyncio.run(run()) == [2, 2, 1]
+        # Streams use their own connection; every pooled reader is free
+        assert db.get_pool()._readers.qsize() == db.get_pool().readers
+
+
+class TestConnectionPool:
+    """Test the pooled WAL connections."""
+
+    def test_wal_enabled(self, db):
+        with db.get_pool().reader() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+
+    def test_reads_do_not_wait_for_writer(self, db):
+        """An open write transaction doesn't block readers."""
+        asyncio.run(db.register_player("1", 2025))
+
+        with db.get_pool().writer() as conn:
+            conn.execute("INSERT INTO players (discord_id, year) VALUES ('2', 2025)")
+            # Uncommitted: readers still see the last committed snapshot
+            assert asyncio.run(db.get_player("1", 2025)) is not None
+            assert asyncio.run(db.get_player("2", 2025)) is None
+            conn.commit()
+
+        assert asyncio.run(db.get_player("2", 2025)) is not None
+
+    def test_reads_do_not_queue_behind_writes(self, db):
+        """Writes waiting on the writer never hold up the reader threads."""
+        asyncio.run(db.register_player("1", 2025))
+
+        @db._writes
+        def slow_write(conn):
+            time.sleep(0.05)
+
+        async def run():
+            writes = [asyncio.ensure_future(slow_write()) for _ in range(6)]
+            await asyncio.sleep(0)
+            start = time.perf_counter()
+            player = await db.get_player("1", 2025)
+            waited = time.perf_counter() - start
+            await asyncio.gather(*writes)
+            return player, waited
+
+        player, waited = asyncio.run(run())
+        assert player is not None
+        assert waited < 0.1
+
+
+class TestBatchedResolution:
+    """Test the bulk and set-based resolution writes."""
+
+    @pytest.fixture
+    def bets(self, db):
+        async def seed():
+            created = []
+            for discord_id in ("1", "2", "3"):
+                player = await db.register_player(discord_id, 2025)
+                position = "no" if discord_id == "3" else "yes"
+                created.append(
+                    await db.create_bet(
+                        player.id, "polymarket", "m1", "M1", position, 25
+                    )
+                )
+            player = await db.get_player("1", 2025)
+            created.append(
+                await db.create_bet(player.id, "polymarket", "m2", "M2", "yes", 50)
+            )
+            return created
+
+        return asyncio.run(seed())
+
+    def test_resolve_bets_in_one_call(self, db, bets):
+        resolutions = [(bet.id, "loss", 0) for bet in bets[:2]]
+        assert asyncio.run(db.resolve_bets(resolutions)) == 2
+        assert len(asyncio.run(db.get_all_unresolved_bets())) == 2
+
+    def test_resolve_market_settles_each_position(self, db, bets):
+        """One UPDATE pays winners and zeroes losers on that market only."""
+        assert asyncio.run(db.resolve_market("polymarket", "m1", "yes")) == 3
+
+        settled = {
+            bet.id: (bet.outcome, bet.payout_cents)
+            for player_id in (1, 2, 3)
+            for bet in asyncio.run(db.get_bets_for_player(player_id))
+        }
+        assert settled[bets[0].id] == ("win", bets[0].stake_cents * 4)
+        assert settled[bets[1].id] == ("win", bets[1].stake_cents * 4)
+        assert settled[bets[2].id] == ("loss", 0)
+        assert settled[bets[3].id] == (None, None)
+
+    def test_resolve_markets_void_pays_nothing(self, db, bets):
+        resolutions = [("polymarket", "m1", "void"), ("polymarket", "m2", "yes")]
+        assert asyncio.run(db.resolve_markets(resolutions)) == 4
+        assert asyncio.run(db.get_all_unresolved_bets()) == []
+
+        rankings = asyncio.run(db.get_leaderboard(2025))
+        totals = {entry["discord_id"]: entry["total_cents"] for entry in rankings}
+        assert totals == {"1": bets[3].stake_cents * 2, "2": 0, "3": 0}
+
+    def test_resolve_market_skips_resolved_bets(self, db, bets):
+        asyncio.run(db.resolve_bets([(bets[0].id, "loss", 0)]))
+        assert asyncio.run(db.resolve_market("polymarket", "m1", "yes")) == 2
+
+
+class TestPlayerStandings:
+    """Test the incrementally maintained leaderboard table."""
+
+    def standings(self, db) -> list[tuple]:
+        with db.get_pool().reader() as conn:
+            return [
+                tuple(row)
+                for row in conn.execute(
+                    "SELECT * FROM player_standings ORDER BY player_id"
+                ).fetchall()
+            ]
+
+    def test_incremental_matches_rebuild(self, db):
+        async def seed():
+            players = [await db.register_player(str(i), 2025) for i in range(4)]
+            for i, player in enumerate(players):
+                for j in range(i + 1):
+                    await db.create_bet(
+                        player.id, "polymarket", f"m{j}", "M", "yes", 10 + 20 * j
+                    )
+            # Player 0 registers but never bets
+            await db.register_player("idle", 2025)
+            await db.resolve_markets(
+                [("polymarket", "m0", "yes"), ("polymarket", "m1", "no")]
+            )
+            await db.resolve_bet(
+                (await db.get_all_unresolved_bets())[0].id, "win", 12345
+            )
+
+        asyncio.run(seed())
+        incremental = self.standings(db)
+
+        assert asyncio.run(db.rebuild_standings()) == 5
+        assert self.standings(db) == incremental
+
+    def test_leaderboard_reads_standings(self, db):
+        year = datetime.now().year
+
+        async def run():
+            winner = await db.register_player("winner", year)
+            other = await db.register_player("other", year)
+            big = await db.create_bet(winner.id, "polymarket", "m1", "M", "yes", 50)
+            await db.create_bet(other.id, "polymarket", "m2", "M", "no", 50)
+            await db.resolve_bet(big.id, "win", 200)
+            return await db.get_leaderboard(year)
+
+        rankings = asyncio.run(run())
+
+        assert [entry["discord_id"] for entry in rankings] == ["winner", "other"]
+        assert rankings[0]["total_cents"] == 200
+        assert rankings[0]["biggest_win_cents"] == 200
+        assert rankings[0]["pending_count"] == 0
+        assert rankings[1]["pending_count"] == 1
+        assert rankings[1]["max_return_cents"] == rankings[1]["total_cents"] + (
+            db.get_bet_stake(datetime.now().month) * 2
+        )
+        max_bets = 16 if datetime.now().month == 1 else 1
+        assert rankings[1]["remaining_bets"] == max_bets - 1
+
+
+class TestPlaceBet:
+    """Test atomic bet placement."""
+
+    def place(self, db, market_id: str, discord_id: str = "42"):
+        return db.place_bet(discord_id, "polymarket", market_id, "M", "yes", 50)
+
+    def test_rejections(self, db, monkeypatch):
+        # A fixed allowance, so the duplicate check is reached in any month
+        monkeypatch.setattr(db, "monthly_allowance", lambda month: 16)
+
+        async def run():
+            unregistered = await self.place(db, "m1", discord_id="7")
+            await db.register_player("42", datetime.now().year)
+            placed = await self.place(db, "m1")
+            duplicate = await self.place(db, "m1")
+            return unregistered, placed, duplicate
+
+        unregistered, placed, duplicate = asyncio.run(run())
+
+        assert unregistered.status == "not_registered"
+        assert placed.status == "placed"
+        assert placed.bet.market_id == "m1"
+        assert placed.remaining == 15
+        assert duplicate.status == "duplicate"
+        assert duplicate.remaining == placed.remaining
+
+    def test_concurrent_bets_respect_quota(self, db):
+        """A burst of /bet calls can't place more than the month allows."""
+
+        async def run():
+            await db.register_player("42", datetime.now().year)
+            return await asyncio.gather(*(self.place(db, f"m{i}") for i in range(20)))
+
+        results = asyncio.run(run())
+        placed = [r for r in results if r.status == "placed"]
+        assert len(placed) == db.monthly_allowance(datetime.now().month)
+        assert asyncio.run(db.get_remaining_bets(placed[0].bet.player_id)) == 0
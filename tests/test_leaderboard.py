@@ -0,0 +1,81 @@
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+
+from commands import leaderboard
+from tests.conftest import FakeInteraction
+
+
+@pytest.fixture
+def reads(monkeypatch, db):
+    """Count leaderboard queries, with a cold render cache."""
+    monkeypatch.setattr(leaderboard, "_rendered", {})
+    monkeypatch.setattr(leaderboard.resolver, "_last_sweep_at", float("inf"))
+
+    calls = []
+    get_leaderboard = db.get_leaderboard
+
+    async def counting(year):
+        calls.append(year)
+        return await get_leaderboard(year)
+
+    monkeypatch.setattr(leaderboard.database, "get_leaderboard", counting)
+    return calls
+
+
+class TestLeaderboardCache:
+    """Test the rendered-leaderboard cache."""
+
+    def run(self) -> FakeInteraction:
+        interaction = FakeInteraction()
+        asyncio.run(leaderboard.leaderboard(interaction))
+        return interaction
+
+    def test_repeat_served_from_cache(self, db, reads):
+        asyncio.run(db.register_player("1", datetime.now().year))
+
+        first = self.run()
+        second = self.run()
+
+        assert len(reads) == 1
+        assert second.sent[0]["embed"] is first.sent[0]["embed"]
+
+    def test_writes_invalidate(self, db, reads):
+        year = datetime.now().year
+        player = asyncio.run(db.register_player("1", year))
+        self.run()
+
+        asyncio.run(db.create_bet(player.id, "polymarket", "m1", "M", "yes", 50))
+        self.run()
+        asyncio.run(db.register_player("2", year))
+        interaction = self.run()
+
+        assert len(reads) == 3
+        assert "<@2>" in interaction.sent[0]["embed"].description
+
+    def test_empty_leaderboard(self, db, reads):
+        interaction = self.run()
+        assert "No players registered yet" in interaction.sent[0]["content"]
+
+    def test_connected_stream_widens_staleness_window(self, db, reads, monkeypatch):
+        """Pushed settlements keep the data fresh; no inline sweep is needed."""
+        sweeps = []
+
+        async def sweep():
+            sweeps.append(1)
+            return 0
+
+        monkeypatch.setattr(leaderboard.resolver, "sweep", sweep)
+        monkeypatch.setattr(
+            leaderboard.resolver,
+            "_last_sweep_at",
+            time.monotonic() - leaderboard.RESOLVE_STALE_SECONDS - 1,
+        )
+        monkeypatch.setattr(leaderboard.resolver, "stream_connected", True)
+        self.run()
+        monkeypatch.setattr(leaderboard.resolver, "stream_connected", False)
+        self.run()
+
+        assert len(sweeps) == 1
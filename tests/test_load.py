@@ -0,0 +1,47 @@
+import asyncio
+
+from benchmarks import load
+from services import database, polymarket, resolver
+
+
+class TestLoadHarness:
+    """Test the end-to-end load harness against its Gamma stand-in."""
+
+    def test_small_run_places_bets_and_restores_globals(self, db):
+        client = polymarket._client
+        cache, scheduler = resolver.market_cache, resolver.scheduler
+        allowance = database.monthly_allowance
+
+        report = asyncio.run(
+            load.run_load(users=5, requests=40, concurrency=8, markets=10, latency=0)
+        )
+
+        assert report["requests"] == 40
+        assert set(report["commands"]) <= {"bet", "bets", "leaderboard"}
+        bet_outcomes = report["commands"]["bet"]["outcomes"]
+        assert "✅ **Bet placed!**" in bet_outcomes
+        assert not any(o.startswith("error") for o in bet_outcomes)
+        assert report["gamma_requests"]
+        for stats in report["commands"].values():
+            assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+
+        assert resolver.market_cache is cache and resolver.scheduler is scheduler
+        assert database.monthly_allowance is allowance
+        assert polymarket._client is client
+
+    def test_stand_in_fails_at_the_configured_rate(self):
+        async def run():
+            gamma = load.GammaStandIn(markets=3, latency=0, error_rate=1.0)
+            await gamma.start()
+            client = polymarket.PolymarketClient(base_url=gamma.base_url, max_retries=0)
+            try:
+                try:
+                    await client.get_json("/markets/1")
+                except polymarket.PolymarketUnavailable:
+                    return True
+                return False
+            finally:
+                await client.close()
+                await gamma.close()
+
+        assert asyncio.run(run())
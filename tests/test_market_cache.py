@@ -0,0 +1,163 @@
+import asyncio
+
+from models import MarketInfo
+from services.market_cache import MarketCache, TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_market(market_id: str = "123") -> MarketInfo:
+    return MarketInfo(
+        platform="polymarket",
+        market_id=market_id,
+        title="Will it rain?",
+        yes_cents=25,
+        no_cents=75,
+        resolved=False,
+        resolution=None,
+    )
+
+
+class TestTTLCache:
+    """Test expiry, eviction and counters."""
+
+    def test_entries_expire(self):
+        clock = FakeClock()
+        cache = TTLCache(maxsize=10, ttl=5, clock=clock)
+        cache.set("a", 1)
+
+        clock.now = 4.9
+        assert cache.get("a") == 1
+        clock.now = 5.0
+        assert cache.get("a") is None
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_least_recently_used_evicted(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+
+class TestMarketCache:
+    """Test the Gamma API market cache."""
+
+    def test_prices_refetched_after_short_ttl(self):
+        clock = FakeClock()
+        cache = MarketCache(price_ttl=15, metadata_ttl=3600, clock=clock)
+        fetches = []
+
+        async def fetch(slug):
+            fetches.append(slug)
+            return make_market()
+
+        async def run():
+            await cache.market("will-it-rain", fetch)
+            await cache.market("will-it-rain", fetch)
+            clock.now = 20
+            await cache.market("will-it-rain", fetch)
+
+        asyncio.run(run())
+        assert fetches == ["will-it-rain", "will-it-rain"]
+        assert cache.get_by_id("123").title == "Will it rain?"
+
+    def test_event_mapping_outlives_prices(self):
+        clock = FakeClock()
+        cache = MarketCache(price_ttl=15, metadata_ttl=3600, clock=clock)
+        fetches = []
+
+        async def fetch(event_slug):
+            fetches.append(event_slug)
+            return "will-it-rain"
+
+        async def run():
+            await cache.event_market_slug("weather", fetch)
+            clock.now = 600
+            return await cache.event_market_slug("weather", fetch)
+
+        assert asyncio.run(run()) == "will-it-rain"
+        assert fetches == ["weather"]
+
+    def test_concurrent_misses_share_one_fetch(self):
+        """A burst of /bet calls on one slug makes a single API request."""
+        cache = MarketCache()
+        fetches = []
+
+        async def fetch(slug):
+            fetches.append(slug)
+            await asyncio.sleep(0.01)
+            return make_market()
+
+        async def run():
+            return await asyncio.gather(
+                *(cache.market("will-it-rain", fetch) for _ in range(10))
+            )
+
+        markets = asyncio.run(run())
+        assert fetches == ["will-it-rain"]
+        assert all(market.market_id == "123" for market in markets)
+
+    def test_missing_markets_not_cached(self):
+        cache = MarketCache()
+        fetches = []
+
+        async def fetch(slug):
+            fetches.append(slug)
+            return None
+
+        async def run():
+            await cache.market("nope", fetch)
+            await cache.market("nope", fetch)
+
+        asyncio.run(run())
+        assert len(fetches) == 2
+        assert cache.stats()["price_hits"] == 0
+
+    def test_expired_prices_refreshed_by_id(self):
+        clock = FakeClock()
+        cache = MarketCache(price_ttl=15, metadata_ttl=3600, clock=clock)
+        fetches, refreshes = [], []
+
+        async def fetch(slug):
+            fetches.append(slug)
+            return make_market()
+
+        async def refresh(market_id):
+            refreshes.append(market_id)
+            return make_market()
+
+        async def run():
+            await cache.market("will-it-rain", fetch, refresh)
+            clock.now = 20
+            await cache.market("will-it-rain", fetch, refresh)
+
+        asyncio.run(run())
+        assert (fetches, refreshes) == (["will-it-rain"], ["123"])
+        metadata = cache.get_metadata("will-it-rain")
+        assert (metadata.market_id, metadata.title) == ("123", "Will it rain?")
+
+    def test_each_lookup_counts_once(self):
+        """A known slug with expired prices is one price miss, not a hit."""
+        clock = FakeClock()
+        cache = MarketCache(price_ttl=15, metadata_ttl=3600, clock=clock)
+        cache.put("will-it-rain", make_market())
+
+        assert cache.get_by_slug("will-it-rain") is not None
+        clock.now = 20
+        assert cache.get_by_slug("will-it-rain") is None
+        assert cache.get_by_slug("unknown") is None
+
+        stats = cache.stats()
+        assert (stats["price_hits"], stats["price_misses"]) == (1, 2)
+        assert (stats["metadata_hits"], stats["metadata_misses"]) == (0, 0)
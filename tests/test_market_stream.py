@@ -0,0 +1,178 @@
+import asyncio
+import json
+
+import pytest
+from aiohttp import web
+
+from services import resolver
+from services.market_stream import MarketStream
+from services.scheduler import ResolutionScheduler
+
+# A recorded session: noise, a settlement for an unwatched market, then m2
+RECORDED = [
+    {"event_type": "price_change", "market": "m1", "price": "0.41"},
+    [
+        {"event_type": "book", "market": "m2"},
+        {"event_type": "market_resolved", "market": "unwatched"},
+    ],
+    "not json",
+    {"event_type": "market_resolved", "market": "m2", "winning_outcome": "Yes"},
+]
+
+
+class ReplayServer:
+    """Local websocket stand-in that replays events after each subscribe.
+
+    With `drop_first`, the first connection is closed right after its
+    subscription arrives, before any events are sent.
+    """
+
+    def __init__(self, events: list, drop_first: bool = False):
+        self.events = events
+        self.drop_first = drop_first
+        self.connections = 0
+        self.subscriptions: list[dict] = []
+        self._runner = None
+        self.url = ""
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/ws", self._ws)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.url = f"ws://127.0.0.1:{self._runner.addresses[0][1]}/ws"
+
+    async def close(self):
+        await self._runner.cleanup()
+
+    async def _ws(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections += 1
+        async for message in ws:
+            self.subscriptions.append(json.loads(message.data))
+            if self.drop_first and self.connections == 1:
+                break
+            for event in self.events:
+                await ws.send_str(
+                    event if isinstance(event, str) else json.dumps(event)
+                )
+        await ws.close()
+        return ws
+
+
+@pytest.fixture
+def checks(monkeypatch):
+    """Gamma reports m2 resolved YES; records every market id checked."""
+    checked = []
+
+    async def check_resolutions(market_ids):
+        checked.append(market_ids)
+        return {m: "yes" if m == "m2" else None for m in market_ids}
+
+    monkeypatch.setattr(resolver.polymarket, "check_resolutions", check_resolutions)
+    monkeypatch.setattr(resolver, "scheduler", ResolutionScheduler())
+    return checked
+
+
+def run_stream(server: ReplayServer, until, **options):
+    """Run a MarketStream against `server` until `await until()` holds."""
+
+    async def run():
+        await server.start()
+        stream = MarketStream(server.url, backoff_base=0.01, **options)
+        stream.start()
+        try:
+            for _ in range(200):
+                if await until():
+                    return stream
+                await asyncio.sleep(0.01)
+            raise AssertionError("stream never reached the expected state")
+        finally:
+            await stream.close()
+            await server.close()
+
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def pending(db):
+    """Pending bets: player 1 on m1, players 2 and 3 on m2."""
+
+    async def seed():
+        for i, market_id in enumerate(["m1", "m2", "m2"], start=1):
+            player = await db.register_player(str(i), 2025)
+            await db.create_bet(player.id, "polymarket", market_id, "M", "yes", 25)
+
+    asyncio.run(seed())
+
+    async def settled(market_id: str) -> bool:
+        return all(m != market_id for _, m, _, _ in await db.get_pending_markets())
+
+    return settled
+
+
+class TestMarketStream:
+    """Test push-triggered resolution against a replayed websocket feed."""
+
+    def test_settlement_event_resolves_only_that_market(self, db, pending, checks):
+        server = ReplayServer(RECORDED)
+
+        run_stream(server, lambda: pending("m2"))
+
+        assert server.subscriptions[0] == {"type": "subscribe", "markets": ["m1", "m2"]}
+        assert checks == [["m2"]]
+        assert not resolver.stream_connected
+        remaining = asyncio.run(db.get_pending_markets())
+        assert [m for _, m, _, _ in remaining] == ["m1"]
+        [bet] = asyncio.run(db.get_bets_for_player(2))
+        assert (bet.outcome, bet.payout_cents) == ("win", bet.stake_cents * 4)
+
+    def test_reconnects_and_resubscribes_after_a_drop(self, db, pending, checks):
+        server = ReplayServer(RECORDED, drop_first=True)
+
+        seen_connected = []
+
+        async def settled() -> bool:
+            seen_connected.append(resolver.stream_connected)
+            return await pending("m2")
+
+        run_stream(server, settled)
+
+        assert server.connections == 2
+        assert any(seen_connected)
+        assert [s["markets"] for s in server.subscriptions] == [["m1", "m2"]] * 2
+
+    def test_reconnects_after_an_unexpected_error(
+        self, db, pending, checks, monkeypatch
+    ):
+        server = ReplayServer(RECORDED)
+        handle = MarketStream._handle
+        failures = []
+
+        def flaky_handle(stream, data):
+            if not failures:
+                failures.append(data)
+                raise KeyError("unexpected payload shape")
+            handle(stream, data)
+
+        monkeypatch.setattr(MarketStream, "_handle", flaky_handle)
+
+        run_stream(server, lambda: pending("m2"))
+
+        assert failures
+        assert server.connections == 2
+
+    def test_unsubscribes_markets_that_settle_elsewhere(self, db, pending, checks):
+        server = ReplayServer([])
+
+        async def unsubscribed() -> bool:
+            if len(server.subscriptions) == 1:
+                await db.resolve_markets([("polymarket", "m2", "no")])
+            return len(server.subscriptions) == 2
+
+        run_stream(server, unsubscribed, refresh_interval=0.05)
+
+        assert server.subscriptions[1] == {"type": "unsubscribe", "markets": ["m2"]}
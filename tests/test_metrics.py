@@ -0,0 +1,113 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from benchmarks.load import GammaStandIn
+from services import metrics, polymarket
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(metrics, "_enabled", True)
+
+
+class TestMetricTypes:
+    """Test recording and the Prometheus text rendering."""
+
+    def test_nothing_is_recorded_until_enabled(self, monkeypatch):
+        monkeypatch.setattr(metrics, "_registry", [])
+        counter = metrics.Counter("test_total", "Test.", ("kind",))
+        histogram = metrics.Histogram("test_seconds", "Test.")
+
+        counter.inc("a")
+        histogram.observe(0.2)
+
+        assert counter.render() == [
+            "# HELP test_total Test.",
+            "# TYPE test_total counter",
+        ]
+        assert len(histogram.render()) == 2
+
+    def test_histogram_buckets_are_cumulative(self, monkeypatch, enabled):
+        monkeypatch.setattr(metrics, "_registry", [])
+        histogram = metrics.Histogram("test_seconds", "Test.", ("query",), (0.1, 1.0))
+
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, "get_player")
+
+        assert histogram.render()[2:] == [
+            'test_seconds_bucket{query="get_player",le="0.1"} 2',
+            'test_seconds_bucket{query="get_player",le="1"} 3',
+            'test_seconds_bucket{query="get_player",le="+Inf"} 4',
+            'test_seconds_sum{query="get_player"} 3.65',
+            'test_seconds_count{query="get_player"} 4',
+        ]
+
+    def test_label_values_are_escaped(self, monkeypatch, enabled):
+        monkeypatch.setattr(metrics, "_registry", [])
+        gauge = metrics.Gauge("test_value", "Test.", ("name",))
+
+        gauge.set(1.5, 'say "hi"\n')
+
+        assert gauge.render()[2] == 'test_value{name="say \\"hi\\"\\n"} 1.5'
+
+
+class TestInstrumentation:
+    """Test what the bot records and serves at /metrics."""
+
+    def test_endpoint_serves_queries_backlog_and_cache(self, db, enabled):
+        async def run():
+            server = metrics.MetricsServer("127.0.0.1", 0)
+            await server.start()
+            try:
+                await db.get_leaderboard(2025)
+                async with aiohttp.ClientSession() as session:
+                    url = f"http://127.0.0.1:{server.port}/metrics"
+                    async with session.get(url) as resp:
+                        return (
+                            resp.status,
+                            resp.headers["Content-Type"],
+                            await resp.text(),
+                        )
+            finally:
+                await server.close()
+
+        status, content_type, body = asyncio.run(run())
+
+        assert status == 200
+        assert content_type.startswith("text/plain; version=0.0.4")
+        assert (
+            'gambabot_db_query_duration_seconds_count{query="get_leaderboard"}' in body
+        )
+        assert (
+            'gambabot_db_query_duration_seconds_count{query="count_unresolved_bets"}'
+            in body
+        )
+        assert "\ngambabot_unresolved_bets 0\n" in body
+        assert "# TYPE gambabot_market_cache_hit_ratio gauge" in body
+
+    def test_gamma_requests_are_labelled_by_route_and_status(self, enabled):
+        responses = metrics.GAMMA_RESPONSES._values
+        ok = ("/markets/{id}", "200")
+        failed = ("/events/slug/{slug}", "503")
+        before = responses.get(ok, 0), responses.get(failed, 0)
+
+        async def run():
+            gamma = GammaStandIn(markets=3, latency=0, error_rate=0)
+            await gamma.start()
+            client = polymarket.PolymarketClient(base_url=gamma.base_url, max_retries=0)
+            try:
+                await client.get_json("/markets/1")
+                await client.get_json("/markets/2")
+                gamma.error_rate = 1.0
+                with pytest.raises(polymarket.PolymarketUnavailable):
+                    await client.get_json("/events/slug/event-1")
+            finally:
+                await client.close()
+                await gamma.close()
+
+        asyncio.run(run())
+
+        assert responses[ok] - before[0] == 2
+        assert responses[failed] - before[1] == 1
@@ -0,0 +1,170 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from services import database, migrations
+
+# schema.sql as it stood before migrations were tracked
+LEGACY_SCHEMA = """
+CREATE TABLE players (
+    id INTEGER PRIMARY KEY,
+    discord_id TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(discord_id, year)
+);
+
+CREATE TABLE bets (
+    id INTEGER PRIMARY KEY,
+    player_id INTEGER NOT NULL,
+    platform TEXT NOT NULL,
+    market_id TEXT NOT NULL,
+    market_title TEXT,
+    position TEXT NOT NULL,
+    price_cents INTEGER NOT NULL,
+    stake_cents INTEGER NOT NULL DEFAULT 100,
+    placed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    placed_year INTEGER NOT NULL,
+    placed_month INTEGER NOT NULL,
+    resolved_at TIMESTAMP,
+    outcome TEXT,
+    payout_cents INTEGER,
+    FOREIGN KEY (player_id) REFERENCES players(id)
+);
+
+CREATE INDEX idx_bets_player ON bets(player_id);
+CREATE INDEX idx_bets_outcome ON bets(outcome);
+CREATE INDEX idx_players_year ON players(year);
+"""
+
+
+@pytest.fixture
+def legacy_db(monkeypatch, tmp_path):
+    """A populated database created from the pre-migrations schema."""
+    path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.executemany(
+        "INSERT INTO players (id, discord_id, year) VALUES (?, ?, 2025)",
+        [(1, "1"), (2, "2")],
+    )
+    conn.executemany(
+        """
+        INSERT INTO bets (player_id, platform, market_id, position, price_cents,
+                          stake_cents, placed_year, placed_month, outcome, payout_cents)
+        VALUES (?, 'polymarket', ?, 'yes', 50, 100, 2025, ?, ?, ?)
+        """,
+        [
+            (1, "m1", 1, "win", 200),
+            (1, "m2", 1, "loss", 0),
+            (1, "m3", 2, None, None),
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(database, "DATABASE_PATH", str(path))
+    yield database
+    database.close_db()
+
+
+def versions(db) -> list[int]:
+    return [version for version, _, _ in asyncio.run(db.get_applied_migrations())]
+
+
+class TestMigrations:
+    """Test versioned schema upgrades."""
+
+    def test_fresh_database_stamped(self, db):
+        expected = [m.version for m in migrations.discover()]
+        assert versions(db) == expected
+        assert db.init_db() == []
+
+    def test_legacy_database_upgraded(self, legacy_db):
+        applied = legacy_db.init_db()
+
+        assert applied == [
+            "002_add_markets_and_events.sql",
+            "003_add_player_standings.sql",
+            "004_backfill_player_standings.py",
+            "005_query_shaped_indexes.py",
+            "006_add_market_end_date.sql",
+        ]
+        assert versions(legacy_db) == [1, 2, 3, 4, 5, 6]
+        assert legacy_db.init_db() == []
+
+        with legacy_db.get_pool().reader() as conn:
+            indexes = {
+                row["name"]
+                for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index'"
+                )
+            }
+        assert "idx_bets_unresolved" in indexes
+        assert "idx_bets_outcome" not in indexes
+
+        rankings = asyncio.run(legacy_db.get_leaderboard(2025))
+        assert [r["discord_id"] for r in rankings] == ["1", "2"]
+        assert rankings[0]["total_cents"] == 200
+        assert rankings[0]["pending_count"] == 1
+
+    def test_duplicate_bets_reported_before_unique_index(self, legacy_db):
+        conn = sqlite3.connect(legacy_db.DATABASE_PATH)
+        conn.execute(
+            """
+            INSERT INTO bets (player_id, platform, market_id, position, price_cents,
+                              placed_year, placed_month)
+            VALUES (1, 'polymarket', 'm1', 'no', 50, 2025, 3)
+            """
+        )
+        conn.commit()
+        conn.close()
+
+        with pytest.raises(sqlite3.IntegrityError, match="market m1: bets 1, 4"):
+            legacy_db.init_db()
+        assert versions(legacy_db) == [1, 2, 3, 4]
+
+    def test_backfill_matches_rebuild(self, legacy_db):
+        legacy_db.init_db()
+        with legacy_db.get_pool().reader() as conn:
+            backfilled = conn.execute(
+                "SELECT * FROM player_standings ORDER BY player_id"
+            ).fetchall()
+
+        asyncio.run(legacy_db.rebuild_standings())
+        with legacy_db.get_pool().reader() as conn:
+            rebuilt = conn.execute(
+                "SELECT * FROM player_standings ORDER BY player_id"
+            ).fetchall()
+
+        assert [tuple(row) for row in backfilled] == [tuple(row) for row in rebuilt]
+
+    def test_failed_migration_rolled_back(self, tmp_path):
+        directory = tmp_path / "migrations"
+        directory.mkdir()
+        (directory / "001_good.sql").write_text("CREATE TABLE a (x INTEGER);")
+        (directory / "002_bad.sql").write_text(
+            "CREATE TABLE b (x INTEGER);\nINSERT INTO missing VALUES (1);"
+        )
+
+        conn = sqlite3.connect(tmp_path / "test.db")
+        conn.execute("CREATE TABLE players (id INTEGER PRIMARY KEY)")
+        conn.execute("CREATE TABLE bets (id INTEGER PRIMARY KEY)")
+        conn.commit()
+
+        with pytest.raises(sqlite3.OperationalError):
+            migrations.migrate(conn, migrations.discover(directory))
+
+        tables = {
+            row[0]
+            for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            )
+        }
+        assert "a" in tables
+        assert "b" not in tables
+        recorded = [
+            row[0] for row in conn.execute("SELECT version FROM schema_migrations")
+        ]
+        assert recorded == [1]
@@ -0,0 +1,279 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from services import polymarket
+from services.resilience import CircuitBreaker
+
+MARKET = {
+    "id": "123",
+    "slug": "will-it-rain",
+    "question": "Will it rain?",
+    "outcomes": '["Yes", "No"]',
+    "outcomePrices": '["0.25", "0.75"]',
+    "closed": False,
+}
+
+
+async def serve_gamma(handlers: dict) -> tuple[web.AppRunner, str]:
+    """Start a local stand-in for the Gamma API, returning (runner, base_url)."""
+    app = web.Application()
+    for path, handler in handlers.items():
+        app.router.add_get(path, handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+class TestPolymarketClient:
+    """Test the shared Gamma API client."""
+
+    def test_calls_share_one_connection(self):
+        """Consecutive requests reuse a kept-alive connection."""
+        peers = []
+
+        async def markets(request):
+            peers.append(request.transport.get_extra_info("peername"))
+            return web.json_response([MARKET])
+
+        async def market(request):
+            peers.append(request.transport.get_extra_info("peername"))
+            return web.json_response(MARKET)
+
+        async def run():
+            runner, base_url = await serve_gamma(
+                {"/markets": markets, "/markets/{id}": market}
+            )
+            client = polymarket.PolymarketClient(base_url=base_url)
+            polymarket.set_client(client)
+            try:
+                info = await polymarket.get_market_info("will-it-rain")
+                resolution = await polymarket.check_resolution("123")
+            finally:
+                polymarket.set_client(None)
+                await client.close()
+                await runner.cleanup()
+            return info, resolution
+
+        info, resolution = asyncio.run(run())
+
+        assert info.market_id == "123"
+        assert info.yes_cents == 25
+        assert resolution is None
+        assert len(peers) == 2
+        assert peers[0] == peers[1]
+
+    def test_non_200_returns_none(self):
+        """Error responses are reported as a missing market."""
+
+        async def missing(request):
+            return web.json_response({}, status=404)
+
+        async def run():
+            runner, base_url = await serve_gamma({"/markets": missing})
+            client = polymarket.PolymarketClient(base_url=base_url)
+            polymarket.set_client(client)
+            try:
+                return await polymarket.get_market_info("nope")
+            finally:
+                polymarket.set_client(None)
+                await client.close()
+                await runner.cleanup()
+
+        assert asyncio.run(run()) is None
+
+
+class TestBulkResolution:
+    """Test multi-id market lookups."""
+
+    def test_many_ids_one_request(self):
+        requests = []
+
+        async def markets(request):
+            ids = request.query.getall("id")
+            requests.append(ids)
+            return web.json_response(
+                [
+                    {
+                        "id": market_id,
+                        "umaResolutionStatus": "resolved",
+                        "outcomePrices": '["1", "0"]',
+                    }
+                    for market_id in ids
+                    if market_id != "3"
+                ]
+            )
+
+        async def market(request):
+            requests.append(request.match_info["id"])
+            return web.json_response({"id": "3", "umaResolutionStatus": "proposed"})
+
+        async def run():
+            runner, base_url = await serve_gamma(
+                {"/markets": markets, "/markets/{id}": market}
+            )
+            client = polymarket.PolymarketClient(base_url=base_url)
+            polymarket.set_client(client)
+            try:
+                return await polymarket.check_resolutions(["1", "2", "3"])
+            finally:
+                polymarket.set_client(None)
+                await client.close()
+                await runner.cleanup()
+
+        resolutions = asyncio.run(run())
+
+        assert resolutions == {"1": "yes", "2": "yes", "3": None}
+        # One list request, plus a single-market fallback for the missing id
+        assert requests == [["1", "2", "3"], "3"]
+
+
+class TestRetries:
+    """Test retry, Retry-After and circuit breaker handling."""
+
+    def run_with_client(self, handlers, call, **client_kwargs):
+        async def run():
+            runner, base_url = await serve_gamma(handlers)
+            client = polymarket.PolymarketClient(
+                base_url=base_url, backoff_base=0.001, **client_kwargs
+            )
+            polymarket.set_client(client)
+            try:
+                return await call(client)
+            finally:
+                polymarket.set_client(None)
+                await client.close()
+                await runner.cleanup()
+
+        return asyncio.run(run())
+
+    def test_transient_errors_retried(self):
+        attempts = []
+
+        async def flaky(request):
+            attempts.append(1)
+            if len(attempts) < 3:
+                return web.json_response({}, status=503)
+            return web.json_response(MARKET)
+
+        resolution = self.run_with_client(
+            {"/markets/{id}": flaky},
+            lambda client: polymarket.check_resolution("123"),
+        )
+        assert resolution is None
+        assert len(attempts) == 3
+
+    def test_retry_after_honored(self):
+        attempts = []
+
+        async def throttled(request):
+            attempts.append(asyncio.get_running_loop().time())
+            if len(attempts) == 1:
+                return web.json_response(
+                    {}, status=429, headers={"Retry-After": "0.05"}
+                )
+            return web.json_response([MARKET])
+
+        info = self.run_with_client(
+            {"/markets": throttled},
+            lambda client: polymarket.get_market_info("will-it-rain"),
+        )
+        assert info.market_id == "123"
+        assert attempts[1] - attempts[0] >= 0.05
+
+    def test_persistent_failure_raises_and_trips_breaker(self):
+        attempts = []
+
+        async def down(request):
+            attempts.append(1)
+            return web.json_response({}, status=502)
+
+        async def call(client):
+            for _ in range(2):
+                with pytest.raises(polymarket.PolymarketUnavailable):
+                    await polymarket.check_resolution("123")
+            return client.breaker.state
+
+        state = self.run_with_client(
+            {"/markets/{id}": down},
+            call,
+            max_retries=1,
+            breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60),
+        )
+        assert state == "open"
+        # Second call failed fast without reaching the server
+        assert len(attempts) == 2
+
+    def test_invalid_json_counts_as_failure(self):
+        async def garbled(request):
+            return web.Response(text="{not json", content_type="application/json")
+
+        async def call(client):
+            with pytest.raises(polymarket.PolymarketUnavailable):
+                await polymarket.check_resolution("123")
+            return client.breaker.state
+
+        state = self.run_with_client(
+            {"/markets/{id}": garbled},
+            call,
+            max_retries=0,
+            breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60),
+        )
+        assert state == "open"
+
+    def test_cancelled_trial_releases_breaker(self):
+        """A half-open trial that never finishes doesn't wedge the breaker."""
+
+        async def hang(request):
+            await asyncio.sleep(0.5)
+
+        async def call(client):
+            client.breaker.record_failure()
+            client.breaker._opened_at -= 60
+            trial = asyncio.ensure_future(polymarket.check_resolution("123"))
+            await asyncio.sleep(0.05)
+            trial.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await trial
+            return client.breaker.allow()
+
+        assert self.run_with_client(
+            {"/markets/{id}": hang},
+            call,
+            breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60),
+        )
+
+    def test_non_trial_call_leaves_trial_claimed(self):
+        """A call admitted before the breaker opened doesn't free another's trial."""
+
+        async def hang(request):
+            await asyncio.sleep(0.5)
+
+        async def call(client):
+            early = asyncio.ensure_future(polymarket.check_resolution("1"))
+            await asyncio.sleep(0.05)
+            client.breaker.record_failure()
+            client.breaker._opened_at -= 60
+            trial = asyncio.ensure_future(polymarket.check_resolution("2"))
+            await asyncio.sleep(0.05)
+            early.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await early
+            admitted = client.breaker.allow()
+            trial.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await trial
+            return admitted
+
+        assert (
+            self.run_with_client(
+                {"/markets/{id}": hang},
+                call,
+                breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60),
+            )
+            is None
+        )
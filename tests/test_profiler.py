@@ -0,0 +1,83 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from services import profiler
+
+
+@pytest.fixture
+def slow_log(tmp_path):
+    """Enable profiling into a temporary log; yields a reader for its records."""
+    path = tmp_path / "slow.log"
+
+    def records() -> list[str]:
+        if profiler._handler is not None:
+            profiler._handler.flush()
+        return path.read_text().split("\n") if path.exists() else []
+
+    yield path, records
+    profiler.disable()
+
+
+def interaction(user_id: int = 7):
+    return SimpleNamespace(
+        user=SimpleNamespace(id=user_id), command=SimpleNamespace(qualified_name="bet")
+    )
+
+
+class TestProfiler:
+    """Test the slow-interaction log."""
+
+    def test_slow_interaction_logs_breakdown_and_arguments(self, db, slow_log):
+        path, records = slow_log
+        profiler.enable(0.01, str(path), 1_000_000, 1)
+
+        @profiler.profiled
+        async def bet_command(interaction, url: str, position: str):
+            await db.get_player("7", 2025)
+            with profiler.span("gamma", "/markets"):
+                await asyncio.sleep(0.02)
+
+        asyncio.run(
+            bet_command(interaction(), url="https://polymarket.com/x", position="yes")
+        )
+
+        line = next(line for line in records() if "{" in line)
+        record = json.loads(line[line.index("{") :])
+        assert record["command"] == "bet"
+        assert record["user_id"] == 7
+        assert record["arguments"] == {
+            "url": "'https://polymarket.com/x'",
+            "position": "'yes'",
+        }
+        assert record["spans"]["sqlite:get_player"]["calls"] == 1
+        assert record["spans"]["gamma:/markets"]["ms"] >= 20
+        assert record["elapsed_ms"] >= record["spans"]["gamma:/markets"]["ms"]
+
+    def test_fast_interactions_and_disabled_profiler_log_nothing(self, db, slow_log):
+        path, records = slow_log
+
+        @profiler.profiled
+        async def rules_command(interaction):
+            await asyncio.sleep(0.02)
+
+        asyncio.run(rules_command(interaction()))
+        profiler.enable(5.0, str(path), 1_000_000, 1)
+        asyncio.run(rules_command(interaction()))
+
+        assert not "".join(records())
+
+    def test_sampled_interaction_includes_cprofile_report(self, slow_log):
+        path, records = slow_log
+        profiler.enable(0, str(path), 1_000_000, 1, sample_rate=1.0)
+
+        @profiler.profiled
+        async def leaderboard_command(interaction):
+            sorted(range(10_000), key=lambda n: -n)
+
+        asyncio.run(leaderboard_command(interaction()))
+
+        assert "function calls" in "\n".join(records())
+        assert not profiler._cprofile_busy
@@ -0,0 +1,76 @@
+import ast
+import re
+from pathlib import Path
+
+import pytest
+
+from services import database
+
+DATABASE_SOURCE = Path(database.__file__)
+
+# Maintenance paths that legitimately read whole tables
+FULL_SCAN_ALLOWED = {"init_db", "get_applied_migrations", "_rebuild_standings"}
+
+SQL_START = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE|WITH)\b", re.IGNORECASE)
+NAMED_PARAM = re.compile(r"(?<!:):(\w+)")
+
+
+def collect_statements() -> list[tuple[str, str]]:
+    """Every SQL string literal in services/database.py, with the function
+    that uses it (or the module-level constant name)."""
+    tree = ast.parse(DATABASE_SOURCE.read_text())
+    statements = []
+
+    def visit(node, owner):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            owner = node.name
+        elif isinstance(node, ast.Assign) and owner is None:
+            owner = node.targets[0].id
+        if (
+            isinstance(node, ast.Constant)
+            and isinstance(node.value, str)
+            and SQL_START.match(node.value)
+        ):
+            statements.append((owner, node.value))
+        for child in ast.iter_child_nodes(node):
+            visit(child, owner)
+
+    for node in tree.body:
+        visit(node, None)
+    return statements
+
+
+def bindings(sql: str):
+    names = NAMED_PARAM.findall(sql)
+    if names:
+        return {name: None for name in names}
+    return (None,) * sql.count("?")
+
+
+STATEMENTS = collect_statements()
+
+
+def test_statements_found():
+    owners = {owner for owner, _ in STATEMENTS}
+    assert {"get_player", "get_leaderboard", "_RESOLVE_MARKET_SQL"} <= owners
+
+
+@pytest.mark.parametrize(
+    "owner,sql",
+    [s for s in STATEMENTS if s[0] not in FULL_SCAN_ALLOWED],
+    ids=[owner for owner, _ in STATEMENTS if owner not in FULL_SCAN_ALLOWED],
+)
+def test_no_full_table_scans(db, owner, sql):
+    with db.get_pool().reader() as conn:
+        plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}", bindings(sql)).fetchall()
+
+    details = [row["detail"] for row in plan]
+    scans = [
+        detail
+        for detail in details
+        if detail.startswith("SCAN ")
+        and "USING" not in detail
+        and "VIRTUAL TABLE" not in detail
+        and "CONSTANT ROW" not in detail
+    ]
+    assert not scans, f"{owner} does a full table scan: {details}"
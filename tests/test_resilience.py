@@ -0,0 +1,94 @@
+import asyncio
+
+from services.resilience import CircuitBreaker, TokenBucket, backoff_delay
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTokenBucket:
+    """Test the client-side rate limiter."""
+
+    def test_burst_then_refill(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, capacity=3, clock=clock)
+
+        assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+        clock.now = 0.5
+        assert bucket.try_acquire()
+        assert not bucket.try_acquire()
+
+    def test_acquire_waits_for_token(self):
+        bucket = TokenBucket(rate=100, capacity=1)
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            await bucket.acquire()
+            await bucket.acquire()
+            return loop.time() - start
+
+        assert asyncio.run(run()) >= 0.005
+
+
+class TestCircuitBreaker:
+    """Test fail-fast behavior while the upstream is down."""
+
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+        for _ in range(2):
+            breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert not breaker.allow()
+
+    def test_half_open_allows_single_trial(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+
+        clock.now = 30
+        assert breaker.allow() == "half-open"
+        assert breaker.allow() is None
+
+        breaker.record_failure()
+        assert breaker.state == "open"
+
+        clock.now = 60
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+    def test_released_trial_lets_another_through(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+
+        clock.now = 30
+        assert breaker.allow()
+        breaker.release_trial()
+        assert breaker.state == "half-open"
+        assert breaker.allow()
+
+    def test_success_resets_failure_count(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == "closed"
+
+
+class TestBackoffDelay:
+    def test_exponential_and_capped(self):
+        assert backoff_delay(0, base=0.5, rng=lambda: 1.0) == 0.5
+        assert backoff_delay(3, base=0.5, rng=lambda: 1.0) == 4.0
+        assert backoff_delay(10, base=0.5, cap=10, rng=lambda: 1.0) == 10
+
+    def test_jittered(self):
+        assert backoff_delay(2, base=1, rng=lambda: 0.25) == 1.0
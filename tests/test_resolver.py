@@ -0,0 +1,331 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from models import Bet, MarketInfo
+from services import resolver
+from services.market_cache import MarketCache
+from services.scheduler import ResolutionScheduler
+
+
+def make_bet(bet_id: int, market_id: str, position: str = "yes", **kwargs) -> Bet:
+    fields = dict(
+        id=bet_id,
+        player_id=bet_id,
+        platform="polymarket",
+        market_id=market_id,
+        market_title=f"Market {market_id}",
+        position=position,
+        price_cents=25,
+        stake_cents=100,
+        placed_at_raw="2025-01-05 00:00:00",
+        placed_year=2025,
+        placed_month=1,
+        resolved_at_raw=None,
+        outcome=None,
+        payout_cents=None,
+    )
+    fields.update(kwargs)
+    return Bet(**fields)
+
+
+@pytest.fixture
+def placed(db):
+    """Thirty players on market m1 (one of them on NO) and one on m2."""
+
+    async def seed():
+        for i in range(1, 32):
+            player = await db.register_player(str(i), 2025)
+            market_id = "m2" if i == 31 else "m1"
+            position = "no" if i == 30 else "yes"
+            await db.create_bet(player.id, "polymarket", market_id, "M", position, 25)
+        return await db.get_all_unresolved_bets()
+
+    return asyncio.run(seed())
+
+
+def outcomes(db) -> dict[int, tuple]:
+    async def load():
+        bets = []
+        for player_id in range(1, 32):
+            bets += await db.get_bets_for_player(player_id)
+        return {bet.player_id: (bet.outcome, bet.payout_cents) for bet in bets}
+
+    return asyncio.run(load())
+
+
+class TestResolveBets:
+    """Test grouped, concurrent market resolution."""
+
+    def test_each_market_checked_once(self, monkeypatch, db, placed):
+        """Bets sharing a market cost a single upstream lookup."""
+        calls = []
+
+        async def check_resolutions(market_ids):
+            calls.append(market_ids)
+            return {market_id: "yes" for market_id in market_ids}
+
+        monkeypatch.setattr(resolver.polymarket, "check_resolutions", check_resolutions)
+
+        count = asyncio.run(resolver.resolve_bets(placed))
+
+        assert count == 31
+        assert calls == [["m1", "m2"]]
+        settled = outcomes(db)
+        assert settled[1] == ("win", placed[0].stake_cents * 4)
+        assert settled[30] == ("loss", 0)
+
+    def test_streamed_sweep_checks_each_market_once(self, monkeypatch, db, placed):
+        """Markets spanning several streamed batches are looked up once."""
+        calls = []
+
+        async def check_resolutions(market_ids):
+            calls.append(market_ids)
+            return {market_id: "yes" for market_id in market_ids}
+
+        monkeypatch.setattr(resolver.polymarket, "check_resolutions", check_resolutions)
+
+        count = asyncio.run(
+            resolver.resolve_bet_stream(db.stream_unresolved_bets(batch_size=7))
+        )
+
+        assert count == 31
+        assert sorted(sum(calls, [])) == ["m1", "m2"]
+        assert asyncio.run(db.get_all_unresolved_bets()) == []
+
+    def test_unresolved_markets_untouched(self, monkeypatch, db, placed):
+        """Markets without a final outcome leave their bets pending."""
+
+        async def check_resolutions(market_ids):
+            return {"m1": None, "m2": "void"}
+
+        monkeypatch.setattr(resolver.polymarket, "check_resolutions", check_resolutions)
+
+        count = asyncio.run(resolver.resolve_bets(placed))
+
+        assert count == 1
+        settled = outcomes(db)
+        assert settled[31] == ("loss", 0)
+        assert settled[1] == (None, None)
+
+    def test_skips_already_resolved(self, monkeypatch):
+        """Resolved bets never trigger a market lookup."""
+
+        async def check_resolutions(market_ids):
+            raise AssertionError("should not be called")
+
+        monkeypatch.setattr(resolver.polymarket, "check_resolutions", check_resolutions)
+
+        bets = [make_bet(1, "m1", outcome="win", payout_cents=400)]
+        assert asyncio.run(resolver.resolve_bets(bets)) == 0
+
+    def test_concurrency_is_bounded(self, monkeypatch, db):
+        """Lookups overlap, but never exceed the configured limit."""
+        in_flight = 0
+        peak = 0
+
+        async def check_resolutions(market_ids):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {}
+
+        monkeypatch.setattr(resolver.polymarket, "check_resolutions", check_resolutions)
+
+        bets = [make_bet(i, f"m{i}") for i in range(10)]
+        asyncio.run(resolver.resolve_bets(bets, concurrency=3, chunk_size=1))
+
+        assert peak == 3
+
+    def test_markets_looked_up_in_chunks(self, monkeypatch, db):
+        """N pending markets cost about N / chunk_size requests."""
+        calls = []
+
+        async def check_resolutions(market_ids):
+            calls.append(market_ids)
+            return {}
+
+        monkeypatch.setattr(resolver.polymarket, "check_resolutions", check_resolutions)
+
+        bets = [make_bet(i, f"m{i}") for i in range(45)]
+        asyncio.run(resolver.resolve_bets(bets, chunk_size=20))
+
+        assert [len(chunk) for chunk in calls] == [20, 20, 5]
+
+    def test_unavailable_upstream_leaves_bets_pending(self, monkeypatch, db, placed):
+        async def check_resolutions(market_ids):
+            raise resolver.polymarket.PolymarketUnavailable("down")
+
+        monkeypatch.setattr(resolver.polymarket, "check_resolutions", check_resolutions)
+
+        assert asyncio.run(resolver.resolve_bets(placed)) == 0
+
+
+class TestRecordedMarkets:
+    """Test that settled facts are persisted and reused across restarts."""
+
+    def test_recorded_resolution_skips_network(self, monkeypatch, db, placed):
+        async def check_resolutions(market_ids):
+            raise AssertionError("should not be called")
+
+        monkeypatch.setattr(resolver.polymarket, "check_resolutions", check_resolutions)
+
+        async def run():
+            await db.resolve_market("polymarket", "m1", "no")
+            await db.resolve_market("polymarket", "m2", "yes")
+            # A bet placed later on a market already on record as settled
+            player = await db.get_player("2", 2025)
+            await db.create_bet(player.id, "polymarket", "m2", "M", "yes", 50)
+            return await resolver.resolve_bets(await db.get_all_unresolved_bets())
+
+        assert asyncio.run(run()) == 1
+
+    def test_closed_market_rejected_from_db(self, monkeypatch, db):
+        """Once seen closed, a market slug is answered without the API."""
+        fetches = []
+
+        async def get_market_info(slug):
+            fetches.append(slug)
+            return MarketInfo(
+                platform="polymarket",
+                market_id="9",
+                title="Done",
+                yes_cents=100,
+                no_cents=1,
+                resolved=True,
+                resolution="yes",
+                slug=slug,
+            )
+
+        monkeypatch.setattr(resolver.polymarket, "get_market_info", get_market_info)
+        monkeypatch.setattr(resolver, "market_cache", MarketCache())
+
+        url = "https://polymarket.com/market/done"
+        first = asyncio.run(resolver.get_market_info(url))
+        resolver.market_cache.prices.clear()
+        second = asyncio.run(resolver.get_market_info(url))
+
+        assert fetches == ["done"]
+        assert first.resolved and second.resolved
+        assert second.market_id == "9"
+
+    def test_multi_outcome_event_remembered(self, monkeypatch, db):
+        fetches = []
+
+        async def get_event(event_slug):
+            fetches.append(event_slug)
+            return {"markets": [{"slug": "a"}, {"slug": "b"}]}
+
+        monkeypatch.setattr(resolver.polymarket, "get_event", get_event)
+
+        url = "https://polymarket.com/event/election"
+        for _ in range(2):
+            monkeypatch.setattr(resolver, "market_cache", MarketCache())
+            assert asyncio.run(resolver.get_market_info(url)) is None
+
+        assert fetches == ["election"]
+
+    def test_event_url_needs_one_request(self, monkeypatch, db):
+        """The market embedded in a yes/no event is used as-is."""
+        fetches = []
+
+        async def get_event(event_slug):
+            fetches.append(event_slug)
+            return {
+                "markets": [
+                    {
+                        "id": "123",
+                        "slug": "will-it-rain",
+                        "question": "Will it rain?",
+                        "outcomes": '["Yes", "No"]',
+                        "outcomePrices": '["0.25", "0.75"]',
+                    }
+                ]
+            }
+
+        async def get_market_info(slug):
+            raise AssertionError("should not be called")
+
+        monkeypatch.setattr(resolver.polymarket, "get_event", get_event)
+        monkeypatch.setattr(resolver.polymarket, "get_market_info", get_market_info)
+        monkeypatch.setattr(resolver, "market_cache", MarketCache())
+
+        market = asyncio.run(
+            resolver.get_market_info("https://polymarket.com/event/rain")
+        )
+
+        assert fetches == ["rain"]
+        assert market.market_id == "123"
+        assert market.yes_cents == 25
+
+
+class TestScheduledSweep:
+    """Test that background sweeps only check markets that are due."""
+
+    def test_far_future_market_skipped(self, monkeypatch, db, placed):
+        calls = []
+
+        async def check_resolutions(market_ids):
+            calls.append(market_ids)
+            return {market_id: None for market_id in market_ids}
+
+        monkeypatch.setattr(resolver.polymarket, "check_resolutions", check_resolutions)
+        monkeypatch.setattr(resolver, "scheduler", ResolutionScheduler())
+
+        far = datetime.now(timezone.utc) + timedelta(days=90)
+        asyncio.run(
+            db.save_market(
+                MarketInfo(
+                    platform="polymarket",
+                    market_id="m1",
+                    title="M1",
+                    yes_cents=50,
+                    no_cents=50,
+                    resolved=False,
+                    resolution=None,
+                    end_date=far,
+                )
+            )
+        )
+
+        asyncio.run(resolver.resolve_due_markets())
+        asyncio.run(resolver.resolve_due_markets())
+
+        assert calls == [["m2"], ["m2"]]
+        pending = asyncio.run(db.get_pending_markets())
+        assert ("polymarket", "m1", far, False) in pending
+
+
+class TestRefreshIfStale:
+    """Test the on-demand catch-up used by /leaderboard."""
+
+    @pytest.fixture(autouse=True)
+    def sweeps(self, monkeypatch):
+        calls = []
+
+        async def resolve_due_markets():
+            calls.append(1)
+            return 0
+
+        monkeypatch.setattr(resolver, "resolve_due_markets", resolve_due_markets)
+        monkeypatch.setattr(resolver, "_last_sweep_at", None)
+        monkeypatch.setattr(resolver, "_sweep_running", False)
+        return calls
+
+    def test_sweeps_when_never_run(self, sweeps):
+        asyncio.run(resolver.refresh_if_stale(60))
+        assert len(sweeps) == 1
+
+    def test_skips_recent_sweep(self, sweeps):
+        """A fresh background sweep makes the command path free."""
+        asyncio.run(resolver.sweep())
+        asyncio.run(resolver.refresh_if_stale(60))
+        assert len(sweeps) == 1
+
+    def test_never_waits_on_running_sweep(self, monkeypatch, sweeps):
+        monkeypatch.setattr(resolver, "_sweep_running", True)
+        asyncio.run(resolver.refresh_if_stale(0))
+        assert sweeps == []
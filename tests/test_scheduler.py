@@ -0,0 +1,109 @@
+from datetime import datetime, timezone
+
+from services.scheduler import ResolutionScheduler
+
+DAY = 86400.0
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def ends_in(clock: FakeClock, seconds: float) -> datetime:
+    return datetime.fromtimestamp(clock.now + seconds, tz=timezone.utc)
+
+
+def make_scheduler(clock: FakeClock) -> ResolutionScheduler:
+    return ResolutionScheduler(
+        interval=100, near_end=DAY, max_backoff=1000, clock=clock
+    )
+
+
+class TestResolutionScheduler:
+    """Test end-date-aware check scheduling."""
+
+    def test_near_and_unknown_markets_due_every_sweep(self):
+        clock = FakeClock()
+        scheduler = make_scheduler(clock)
+        scheduler.sync(
+            [
+                ("polymarket", "ending", ends_in(clock, 3600), False),
+                ("polymarket", "ended", ends_in(clock, -3600), False),
+                ("polymarket", "unknown", None, False),
+                ("polymarket", "closed", ends_in(clock, 30 * DAY), True),
+            ]
+        )
+
+        for _ in range(3):
+            assert len(scheduler.take_due()) == 4
+            clock.now += 1
+
+    def test_far_future_market_backs_off(self):
+        clock = FakeClock()
+        scheduler = make_scheduler(clock)
+        key = ("polymarket", "far")
+        scheduler.sync([(*key, ends_in(clock, 30 * DAY), False)])
+
+        assert scheduler.take_due() == []
+        checks = []
+        for _ in range(20):
+            clock.now = scheduler.next_due(key)
+            assert scheduler.take_due() == [key]
+            checks.append(clock.now)
+
+        gaps = [b - a for a, b in zip(checks, checks[1:])]
+        assert gaps[:3] == [200, 400, 800]
+        assert max(gaps) == 1000
+
+    def test_backoff_survives_many_checks(self):
+        """Checks keep counting past the cap without the delay overflowing."""
+        clock = FakeClock()
+        # Float settings, as read from the environment
+        scheduler = ResolutionScheduler(
+            interval=100.0, near_end=DAY, max_backoff=1000.0, clock=clock
+        )
+        key = ("polymarket", "years-away")
+        scheduler.sync([(*key, ends_in(clock, 10_000 * DAY), False)])
+
+        for _ in range(1100):
+            clock.now = scheduler.next_due(key)
+            assert scheduler.take_due() == [key]
+
+        assert scheduler.next_due(key) == clock.now + 1000
+
+    def test_backoff_stops_near_end_date(self):
+        clock = FakeClock()
+        scheduler = make_scheduler(clock)
+        key = ("polymarket", "soon")
+        end_date = ends_in(clock, DAY + 250)
+        scheduler.sync([(*key, end_date, False)])
+
+        clock.now = scheduler.next_due(key)
+        scheduler.take_due()
+        # Backoff would say +200, but the market is near its end after +150
+        assert scheduler.next_due(key) == end_date.timestamp() - DAY
+
+    def test_sync_drops_settled_and_applies_closure(self):
+        clock = FakeClock()
+        scheduler = make_scheduler(clock)
+        far = ends_in(clock, 30 * DAY)
+        scheduler.sync(
+            [("polymarket", "a", far, False), ("polymarket", "b", far, False)]
+        )
+
+        scheduler.sync([("polymarket", "a", far, True)])
+
+        assert len(scheduler) == 1
+        assert scheduler.take_due() == [("polymarket", "a")]
+
+    def test_forgotten_market_not_returned(self):
+        clock = FakeClock()
+        scheduler = make_scheduler(clock)
+        scheduler.sync([("polymarket", "a", None, False)])
+        scheduler.forget(("polymarket", "a"))
+
+        assert scheduler.take_due() == []
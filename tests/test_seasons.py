@@ -0,0 +1,36 @@
+import asyncio
+from datetime import datetime
+
+from benchmarks import seasons
+
+
+class TestSeasonGenerator:
+    """Test the synthetic data used by the benchmarks."""
+
+    def test_generated_season_is_consistent(self, db):
+        now = datetime(2025, 3, 15)
+        with db.get_pool().writer() as conn:
+            season = seasons.generate(conn, 500, now=now)
+            triggers = {
+                row["name"]
+                for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'trigger'"
+                )
+            }
+            duplicates = conn.execute(
+                """
+                SELECT COUNT(*) FROM (
+                    SELECT 1 FROM bets GROUP BY player_id, market_id HAVING COUNT(*) > 1
+                )
+                """
+            ).fetchone()[0]
+
+        assert season.bets == 500
+        assert season.years == [2023, 2024, 2025]
+        assert "standings_on_bet" in triggers
+        assert duplicates == 0
+
+        boards = {year: asyncio.run(db.get_leaderboard(year)) for year in season.years}
+        assert sum(len(board) for board in boards.values()) == season.players
+        assert not any(r["pending_count"] for r in boards[2023])
+        assert any(r["pending_count"] for r in boards[2025])